@@ -3,32 +3,26 @@ Octavia's Configuration System
 """
 
 import os
+from functools import cached_property, lru_cache
 from pathlib import Path
 from typing import Dict, Any
 
+# Resolved once at import instead of on every instantiation
+_BASE_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+
 class Config:
     """Configuration management for Octavia"""
     
     def __init__(self):
         # Base paths
-        self.BASE_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
-        self.DATA_DIR = self.BASE_DIR / "data"
-        self.DB_DIR = self.DATA_DIR / "db"
-        
-        # Create necessary directories
-        self.DATA_DIR.mkdir(exist_ok=True)
-        self.DB_DIR.mkdir(exist_ok=True)
-        
-        # Database paths
-        self.ABILITIES_DB = self.DB_DIR / "abilities.db"
-        self.TASKS_DB = self.DB_DIR / "tasks.db"
-        self.MEMORY_DB = self.DB_DIR / "memory.db"
+        self.BASE_DIR = _BASE_DIR
         
         # API Configuration
         self.GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
         
         # Model Configuration
         self.DEFAULT_MODEL = "gemini-1.5-flash"  # Updated to latest model
+        self.CODE_MODEL = "gemini-pro-code"
         
         # System Configuration
         self.DEFAULT_TEMPERATURE = 0.7
@@ -37,10 +31,39 @@ class Config:
         self.TOP_P = 0.95
         self.CANDIDATE_COUNT = 1
         self.MAX_ACTIVE_LENGTH = 1000000  # 1M tokens for conversation history
+        self.MAX_HISTORY_LENGTH = 10
+        
+    @cached_property
+    def DATA_DIR(self) -> Path:
+        """Data directory (not created until a database path is used)"""
+        return self.BASE_DIR / "data"
         
-    @property
+    @cached_property
+    def DB_DIR(self) -> Path:
+        """Database directory, created on first access"""
+        db_dir = self.DATA_DIR / "db"
+        self.DATA_DIR.mkdir(exist_ok=True)
+        db_dir.mkdir(exist_ok=True)
+        return db_dir
+        
+    @cached_property
+    def ABILITIES_DB(self) -> Path:
+        """Abilities database path"""
+        return self.DB_DIR / "abilities.db"
+        
+    @cached_property
+    def TASKS_DB(self) -> Path:
+        """Tasks database path"""
+        return self.DB_DIR / "tasks.db"
+        
+    @cached_property
+    def MEMORY_DB(self) -> Path:
+        """Memory database path"""
+        return self.DB_DIR / "memory.db"
+        
+    @cached_property
     def as_dict(self) -> Dict[str, Any]:
-        """Return configuration as a dictionary"""
+        """Return configuration as a dictionary (built once; creates the data directories)"""
         return {
             "base_dir": str(self.BASE_DIR),
             "data_dir": str(self.DATA_DIR),
@@ -49,10 +72,17 @@ class Config:
             "tasks_db": str(self.TASKS_DB),
             "memory_db": str(self.MEMORY_DB),
             "default_model": self.DEFAULT_MODEL,
+            "code_model": self.CODE_MODEL,
             "temperature": self.DEFAULT_TEMPERATURE,
             "max_output_tokens": self.MAX_OUTPUT_TOKENS,
             "top_k": self.TOP_K,
             "top_p": self.TOP_P,
             "candidate_count": self.CANDIDATE_COUNT,
-            "max_active_length": self.MAX_ACTIVE_LENGTH
+            "max_active_length": self.MAX_ACTIVE_LENGTH,
+            "max_history_length": self.MAX_HISTORY_LENGTH
         }
+
+@lru_cache(maxsize=1)
+def get_config() -> Config:
+    """Return the shared Config instance, creating it on first use"""
+    return Config()
@@ -8,9 +8,8 @@ import os
 import sys
 import asyncio
 import logging
-from qasync import QEventLoop, QApplication
+import threading
 from loguru import logger
-from src.interface.main_window import MainWindow
 
 # Create logs directory if it doesn't exist
 log_dir = os.path.join(os.path.dirname(__file__), "logs")
@@ -23,8 +22,22 @@ logger.add(os.path.join(log_dir, 'octavia.log'), rotation="1 day", retention="7
 
 logger = logger.bind(name="OctaviaRunner")
 
+def start_system_setup() -> threading.Thread:
+    """Run system setup on a background thread so it overlaps Qt startup"""
+    from setup_system import SystemSetup
+    
+    thread = threading.Thread(
+        target=SystemSetup().run_setup,
+        name="octavia-setup",
+        daemon=True
+    )
+    thread.start()
+    return thread
+
 async def init_window():
     """Initialize the main window and its async components"""
+    from src.interface.main_window import MainWindow
+    
     window = MainWindow()
     await window.initialize()
     window.show()
@@ -35,10 +48,15 @@ def main():
     try:
         logger.info("Starting Octavia...")
         
-        # Create application instance
-        app = QApplication.instance()
-        if not app:
-            app = QApplication(sys.argv)
+        # Create databases while Qt and the main window are loading
+        setup_thread = start_system_setup()
+        
+        # Qt is imported here so error paths never pay its import cost
+        from qasync import QEventLoop
+        from PySide6.QtWidgets import QApplication
+        
+        # Reuse an existing application instance (e.g. under a test harness)
+        app = QApplication.instance() or QApplication(sys.argv)
         
         # Create event loop
         loop = QEventLoop(app)
@@ -49,6 +67,13 @@ def main():
             window = loop.run_until_complete(init_window())
             loop.run_forever()
             
+            # The app has quit; flush and release background systems
+            loop.run_until_complete(window.shutdown())
+            
+        # Nothing at runtime reads the setup databases, so this is the only
+        # join: it keeps a quick exit from killing setup mid-write
+        setup_thread.join()
+            
     except Exception as e:
         logger.error(f"Error starting Octavia: {str(e)}")
         raise
@@ -6,27 +6,17 @@ OPTIONS = {
     'argv_emulation': False,  # Changed to False to prevent issues with argv handling
     'packages': [
         'PySide6',
-        'google',
         'loguru',
         'aiohttp',
         'google.generativeai',
-        'google.auth',
-        'google.api_core',
-        'vertexai',
-        'numpy',
-        'sklearn',
-        'scipy',
         'qasync',
-        'asyncio',
-        'sparkle',  # For auto-updates
     ],
     'includes': [
         'google.generativeai',
         'PySide6.QtCore',
         'PySide6.QtGui',
         'PySide6.QtWidgets',
-        'sklearn.feature_extraction.text',
-        'numpy',
+        'sklearn.feature_extraction.text',  # Imported lazily for TF-IDF scoring
         'asyncio',
         'qasync',
     ],
@@ -1,3 +1,7 @@
 #!/bin/bash
 source venv/bin/activate
 pip install -r requirements.txt
+
+# Byte-compile the app up front so the first launch unmarshals cached
+# .pyc files instead of compiling every module it imports
+python -m compileall -q -j 0 src run.py config.py setup_system.py
@@ -6,168 +6,262 @@ Initializes databases, memory system, and consciousness components
 import os
 import sqlite3
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Dict
 from loguru import logger
 
-# Configure logging
-logger.add("setup.log", rotation="1 MB")
+# Tag setup records so callers' sinks can tell them apart; importing this
+# module must not register sinks of its own
+logger = logger.bind(component="setup")
+
+# Project root, computed once when the module is imported
+_BASE_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+
+# Schema for data/db/abilities.db
+_ABILITIES_DDL = """
+    BEGIN IMMEDIATE;
+
+    CREATE TABLE IF NOT EXISTS abilities (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE,
+        description TEXT,
+        ability_type TEXT NOT NULL,
+        requirements TEXT,
+        metadata TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS ability_metrics (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ability_id INTEGER NOT NULL,
+        success BOOLEAN NOT NULL,
+        response_time FLOAT,
+        context TEXT,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (ability_id) REFERENCES abilities (id)
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_am_ability ON ability_metrics(ability_id);
+
+    COMMIT;
+"""
+
+# Schema for data/db/tasks.db
+_TASKS_DDL = """
+    BEGIN IMMEDIATE;
+
+    CREATE TABLE IF NOT EXISTS tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        description TEXT,
+        status TEXT NOT NULL,
+        priority TEXT NOT NULL,
+        context TEXT,
+        parent_id INTEGER,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (parent_id) REFERENCES tasks (id)
+    );
+
+    CREATE TABLE IF NOT EXISTS task_dependencies (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_id INTEGER NOT NULL,
+        depends_on_id INTEGER NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (task_id) REFERENCES tasks (id),
+        FOREIGN KEY (depends_on_id) REFERENCES tasks (id)
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_td_task ON task_dependencies(task_id);
+    CREATE INDEX IF NOT EXISTS idx_td_dep ON task_dependencies(depends_on_id);
+
+    COMMIT;
+"""
+
+# Schema for data/db/memory.db
+_MEMORY_DDL = """
+    BEGIN IMMEDIATE;
+
+    CREATE TABLE IF NOT EXISTS memory_patterns (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        pattern_type TEXT NOT NULL,
+        pattern_data TEXT NOT NULL,
+        confidence FLOAT,
+        frequency INTEGER DEFAULT 1,
+        last_accessed TIMESTAMP,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS pattern_relationships (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        pattern_id INTEGER NOT NULL,
+        related_pattern_id INTEGER NOT NULL,
+        relationship_type TEXT NOT NULL,
+        strength FLOAT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (pattern_id) REFERENCES memory_patterns (id),
+        FOREIGN KEY (related_pattern_id) REFERENCES memory_patterns (id)
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_mp_type ON memory_patterns(pattern_type, last_accessed);
+    CREATE INDEX IF NOT EXISTS idx_pr_pat ON pattern_relationships(pattern_id);
+    CREATE INDEX IF NOT EXISTS idx_pr_rel ON pattern_relationships(related_pattern_id);
+
+    COMMIT;
+"""
+
+def _connect(path: Path) -> sqlite3.Connection:
+    """Open an autocommit connection with a larger prepared-statement cache"""
+    return sqlite3.connect(
+        path,
+        isolation_level=None,
+        cached_statements=512,
+        check_same_thread=False
+    )
 
 class SystemSetup:
+    # Marker written once setup has fully succeeded; bump the suffix when
+    # the schema changes so existing installs re-run setup
+    SETUP_MARKER = ".setup_v1"
+    
+    # Directories created under data/ (db_dir is data/db)
+    DATA_SUBDIRS = ("db", "memory", "logs", "cache")
+    
     def __init__(self):
-        self.base_dir = Path(os.path.dirname(os.path.abspath(__file__)))
+        self.base_dir = _BASE_DIR
         self.data_dir = self.base_dir / "data"
         self.db_dir = self.data_dir / "db"
+        self._conn_cache: Dict[Path, sqlite3.Connection] = {}
+        
+    def is_setup_complete(self) -> bool:
+        """Check for the setup marker with a single stat call"""
+        try:
+            os.stat(self.data_dir / self.SETUP_MARKER)
+            return True
+        except FileNotFoundError:
+            return False
+            
+    def _mark_setup_complete(self):
+        """Write the setup marker so later runs can skip setup"""
+        os.close(os.open(self.data_dir / self.SETUP_MARKER, os.O_CREAT | os.O_WRONLY, 0o644))
         
     def create_directories(self):
         """Create necessary directories"""
         logger.info("Creating system directories...")
-        directories = [
-            self.data_dir,
-            self.db_dir,
-            self.data_dir / "memory",
-            self.data_dir / "logs",
-            self.data_dir / "cache"
-        ]
-        
-        for directory in directories:
+        # Only the leaves need a mkdir; parents=True creates data/ itself
+        for name in self.DATA_SUBDIRS:
+            directory = self.data_dir / name
             directory.mkdir(parents=True, exist_ok=True)
             logger.info(f"Created directory: {directory}")
             
+    def _conn(self, path: Path) -> sqlite3.Connection:
+        """Get the shared connection for a database file, opening it once"""
+        conn = self._conn_cache.get(path)
+        if conn is None:
+            conn = _connect(path)
+            self._apply_pragmas(conn)
+            self._conn_cache[path] = conn
+        return conn
+        
+    def close_connections(self):
+        """Close every cached database connection"""
+        for conn in self._conn_cache.values():
+            conn.close()
+        self._conn_cache.clear()
+        
+    def _apply_pragmas(self, conn: sqlite3.Connection):
+        """Tune a freshly opened connection
+        
+        WAL is persisted in the database header, so runtime connections
+        opened later inherit it along with its cheaper commit path.
+        """
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-64000")
+        conn.execute("PRAGMA mmap_size=268435456")
+            
+    def _run_script(self, conn: sqlite3.Connection, script: str):
+        """Run a DDL script that manages its own transaction
+        
+        Connections are in autocommit mode, so the script's BEGIN/COMMIT
+        are the only transaction boundaries; roll back if it fails midway.
+        """
+        try:
+            conn.executescript(script)
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+            
     def setup_abilities_db(self):
         """Initialize the abilities tracking database"""
         logger.info("Setting up abilities database...")
         db_path = self.db_dir / "abilities.db"
         
-        with sqlite3.connect(db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Create abilities table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS abilities (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL UNIQUE,
-                    description TEXT,
-                    ability_type TEXT NOT NULL,
-                    requirements TEXT,
-                    metadata TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Create ability metrics table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS ability_metrics (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    ability_id INTEGER NOT NULL,
-                    success BOOLEAN NOT NULL,
-                    response_time FLOAT,
-                    context TEXT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (ability_id) REFERENCES abilities (id)
-                )
-            """)
-            
-            conn.commit()
-            logger.info("Abilities database initialized")
+        conn = self._conn(db_path)
+        self._run_script(conn, _ABILITIES_DDL)
+        
+        logger.info("Abilities database initialized")
             
     def setup_tasks_db(self):
         """Initialize the task tracking database"""
         logger.info("Setting up tasks database...")
         db_path = self.db_dir / "tasks.db"
         
-        with sqlite3.connect(db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Create tasks table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS tasks (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    status TEXT NOT NULL,
-                    priority TEXT NOT NULL,
-                    context TEXT,
-                    parent_id INTEGER,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (parent_id) REFERENCES tasks (id)
-                )
-            """)
-            
-            # Create task dependencies table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS task_dependencies (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    task_id INTEGER NOT NULL,
-                    depends_on_id INTEGER NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (task_id) REFERENCES tasks (id),
-                    FOREIGN KEY (depends_on_id) REFERENCES tasks (id)
-                )
-            """)
-            
-            conn.commit()
-            logger.info("Tasks database initialized")
+        conn = self._conn(db_path)
+        self._run_script(conn, _TASKS_DDL)
+        
+        logger.info("Tasks database initialized")
             
     def setup_memory_db(self):
         """Initialize the memory patterns database"""
         logger.info("Setting up memory database...")
         db_path = self.db_dir / "memory.db"
         
-        with sqlite3.connect(db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Create memory patterns table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS memory_patterns (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    pattern_type TEXT NOT NULL,
-                    pattern_data TEXT NOT NULL,
-                    confidence FLOAT,
-                    frequency INTEGER DEFAULT 1,
-                    last_accessed TIMESTAMP,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Create pattern relationships table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS pattern_relationships (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    pattern_id INTEGER NOT NULL,
-                    related_pattern_id INTEGER NOT NULL,
-                    relationship_type TEXT NOT NULL,
-                    strength FLOAT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (pattern_id) REFERENCES memory_patterns (id),
-                    FOREIGN KEY (related_pattern_id) REFERENCES memory_patterns (id)
-                )
-            """)
-            
-            conn.commit()
-            logger.info("Memory database initialized")
+        conn = self._conn(db_path)
+        self._run_script(conn, _MEMORY_DDL)
+        
+        logger.info("Memory database initialized")
             
     def run_setup(self):
         """Run the complete system setup"""
         try:
+            if self.is_setup_complete():
+                logger.debug("System setup already complete, skipping")
+                return True
+                
             logger.info("Starting Octavia system setup...")
             
             # Create necessary directories
             self.create_directories()
             
-            # Setup databases
-            self.setup_abilities_db()
-            self.setup_tasks_db()
-            self.setup_memory_db()
+            # Setup databases; each is an independent file on its own
+            # connection, so they can be created concurrently
+            setup_steps = (self.setup_abilities_db, self.setup_tasks_db, self.setup_memory_db)
+            with ThreadPoolExecutor(max_workers=len(setup_steps)) as executor:
+                list(executor.map(lambda step: step(), setup_steps))
             
+            self._mark_setup_complete()
             logger.info("System setup completed successfully!")
             return True
             
         except Exception as e:
             logger.error(f"Error during system setup: {str(e)}")
             return False
+            
+        finally:
+            self.close_connections()
 
 if __name__ == "__main__":
+    # Standalone runs get their own log file for setup records only
+    logger.add(
+        "setup.log",
+        rotation="1 MB",
+        filter=lambda record: record["extra"].get("component") == "setup"
+    )
+    
     setup = SystemSetup()
     success = setup.run_setup()
     
@@ -2,15 +2,75 @@
 Octavia's Abilities Awareness System - Tracks and manages understanding of available capabilities
 """
 
-from typing import Dict, List, Optional, Any, Set
+from typing import Dict, List, Optional, Any, Set, Callable
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-import json
+import orjson
+import time
+import asyncio
 from pathlib import Path
+from uuid import uuid4
 import sqlite3
 from loguru import logger
 
+# Statements used on every call, defined once so each call passes the same
+# string to the connection's statement cache
+_SQL_INSERT_ABILITY = """
+    INSERT INTO abilities
+    (id, name, description, ability_type, status, requirements,
+     created_at, updated_at, metadata)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_UPDATE_STATUS = """
+    UPDATE abilities
+    SET status = ?, updated_at = ?, metadata = ?
+    WHERE id = ?
+"""
+
+_SQL_INSERT_METRIC = """
+    INSERT INTO ability_metrics
+    (ability_id, timestamp, metric_type, metric_value)
+    VALUES (?, ?, ?, ?)
+"""
+
+_SQL_UPSERT_CURRENT_METRICS = """
+    INSERT INTO ability_metrics_current
+    (ability_id, usage_count, success_count, avg_response_time, confidence, last_used)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(ability_id) DO UPDATE SET
+        usage_count = excluded.usage_count,
+        success_count = excluded.success_count,
+        avg_response_time = excluded.avg_response_time,
+        confidence = excluded.confidence,
+        last_used = excluded.last_used
+"""
+
+_SQL_SELECT_CURRENT_METRICS = """
+    SELECT ability_id, usage_count, success_count, avg_response_time,
+           confidence, last_used
+    FROM ability_metrics_current
+"""
+
+_SQL_SELECT_ABILITIES = """
+    SELECT id, name, ability_type, status, metadata
+    FROM abilities
+"""
+
+_SQL_SELECT_SUGGESTIONS = """
+    SELECT a.id, a.name, a.description, a.ability_type,
+           c.usage_count,
+           CAST(c.success_count AS REAL) / c.usage_count as success_rate
+    FROM abilities a
+    JOIN ability_metrics_current c ON a.id = c.ability_id
+    WHERE a.id NOT IN (SELECT value FROM json_each(?))
+    AND c.usage_count > 0
+    AND success_rate >= 0.7
+    ORDER BY c.usage_count DESC, success_rate DESC
+    LIMIT 5
+"""
+
 class AbilityType(Enum):
     """Types of abilities Octavia can have"""
     PERCEPTION = "perception"       # Abilities to perceive and understand input
@@ -35,141 +95,331 @@ class AbilityStatus(Enum):
 class AbilityMetrics:
     """Metrics tracking ability usage and effectiveness"""
     usage_count: int = 0
+    success_count: int = 0
     success_rate: float = 0.0
     avg_response_time: float = 0.0
     last_used: Optional[datetime] = None
     confidence_level: float = 0.5
 
+@dataclass(slots=True)
+class _ActiveAbility:
+    """In-memory record of a registered ability"""
+    id: str
+    name: str
+    type: AbilityType
+    status: AbilityStatus
+    handler: Optional[Callable] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    context_sets: List[tuple] = field(default_factory=list)
+
 class AbilityAwareness:
     """Manages awareness of Octavia's abilities"""
     
+    # Buffered metric rows are written once either limit is reached
+    METRICS_BATCH_SIZE = 256
+    METRICS_FLUSH_INTERVAL = 1.0  # seconds
+    
+    # A history snapshot is kept in ability_metrics every this many uses
+    METRICS_HISTORY_INTERVAL = 100
+    
     def __init__(self, db_path: Optional[str] = None):
         """Initialize abilities awareness system"""
         if db_path is None:
             db_path = Path.home() / ".octavia" / "abilities.db"
+        db_path = Path(db_path)
         db_path.parent.mkdir(parents=True, exist_ok=True)
         self.db_path = db_path
-        self._init_database()
-        self._active_abilities: Dict[str, Dict[str, Any]] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._write_lock = asyncio.Lock()
+        self._metrics_buffer: List[tuple] = []
+        # Latest ability_metrics_current row per ability awaiting a flush
+        self._dirty_metrics: Dict[str, tuple] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._active_abilities: Dict[str, _ActiveAbility] = {}
         self._ability_metrics: Dict[str, AbilityMetrics] = {}
+        # Context key -> ids of abilities with a context using that key
+        self._context_key_index: Dict[str, Set[str]] = {}
+        self._init_database()
+        self._load_abilities()
+        
+    def _get_conn(self) -> sqlite3.Connection:
+        """Get the long-lived database connection, opening it on first use"""
+        if self._conn is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                isolation_level=None,
+                cached_statements=512,
+                check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA mmap_size=268435456")
+            conn.execute("PRAGMA cache_size=-65536")
+            self._conn = conn
+        return self._conn
+        
+    def _write_pending(self):
+        """Write buffered metric rows and current snapshots in one transaction"""
+        if not self._metrics_buffer and not self._dirty_metrics:
+            return
+        rows, self._metrics_buffer = self._metrics_buffer, []
+        current = list(self._dirty_metrics.values())
+        self._dirty_metrics.clear()
         
+        conn = self._get_conn()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(_SQL_UPSERT_CURRENT_METRICS, current)
+            conn.executemany(_SQL_INSERT_METRIC, rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+            
+    async def _flush_metrics(self):
+        """Write buffered metric rows in a single transaction"""
+        async with self._write_lock:
+            self._write_pending()
+                
+    async def _flush_later(self):
+        """Flush buffered metrics once the flush interval has passed"""
+        try:
+            await asyncio.sleep(self.METRICS_FLUSH_INTERVAL)
+            self._flush_task = None
+            await self._flush_metrics()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error flushing ability metrics: {e}")
+            
+    async def aclose(self):
+        """Flush buffered metrics and close the database connection"""
+        async with self._write_lock:
+            self.close()
+        
+    def close(self):
+        """Write pending metrics and close the database connection"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        try:
+            # Current counters must match memory, or the next start loads stale ones
+            self._write_pending()
+        except Exception as e:
+            logger.error(f"Error flushing ability metrics: {e}")
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+            
     def _init_database(self):
         """Initialize the abilities database"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        conn = self._get_conn()
+        cursor = conn.cursor()
+
+        # Store abilities
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS abilities (
+                id TEXT PRIMARY KEY,
+                name TEXT,
+                description TEXT,
+                ability_type TEXT,
+                status TEXT,
+                requirements BLOB,
+                created_at INTEGER,
+                updated_at INTEGER,
+                metadata BLOB
+            )
+        """)
+        
+        # Store ability relationships
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ability_relationships (
+                ability_id TEXT,
+                related_id TEXT,
+                relationship_type TEXT,
+                FOREIGN KEY(ability_id) REFERENCES abilities(id),
+                FOREIGN KEY(related_id) REFERENCES abilities(id)
+            )
+        """)
+        
+        # Store ability metrics
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ability_metrics (
+                ability_id TEXT,
+                timestamp INTEGER,
+                metric_type TEXT,
+                metric_value REAL,
+                FOREIGN KEY(ability_id) REFERENCES abilities(id)
+            )
+        """)
+        
+        # Store the current metrics of each ability, updated in place
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ability_metrics_current (
+                ability_id TEXT PRIMARY KEY,
+                usage_count INTEGER,
+                success_count INTEGER,
+                avg_response_time REAL,
+                confidence REAL,
+                last_used INTEGER,
+                FOREIGN KEY(ability_id) REFERENCES abilities(id)
+            )
+        """)
+        
+        # Index the status filter and the metrics join/lookup columns
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_abilities_status ON abilities(status)")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_metrics_ability_type
+            ON ability_metrics(ability_id, metric_type, metric_value)
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_metrics_ts ON ability_metrics(timestamp)")
+        
+        # Gather planner statistics once; later sessions reuse them
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+        if cursor.fetchone() is None:
+            cursor.execute("ANALYZE")
             
-            # Store abilities
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS abilities (
-                    id TEXT PRIMARY KEY,
-                    name TEXT,
-                    description TEXT,
-                    ability_type TEXT,
-                    status TEXT,
-                    requirements TEXT,
-                    created_at TEXT,
-                    updated_at TEXT,
-                    metadata TEXT
-                )
-            """)
+    def _load_abilities(self):
+        """Populate the in-memory ability mirror from the database"""
+        try:
+            cursor = self._get_conn().cursor()
+            cursor.execute(_SQL_SELECT_ABILITIES)
             
-            # Store ability relationships
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS ability_relationships (
-                    ability_id TEXT,
-                    related_id TEXT,
-                    relationship_type TEXT,
-                    FOREIGN KEY(ability_id) REFERENCES abilities(id),
-                    FOREIGN KEY(related_id) REFERENCES abilities(id)
+            # Rows are decoded as they are stepped, never materialised as a list
+            for ability_id, name, ability_type, status, metadata in cursor:
+                metadata = orjson.loads(metadata) if metadata else {}
+                self._active_abilities[ability_id] = _ActiveAbility(
+                    id=ability_id,
+                    name=name,
+                    type=AbilityType(ability_type),
+                    status=AbilityStatus(status),
+                    metadata=metadata,
+                    context_sets=self._prepare_contexts(metadata.get('contexts', []))
                 )
-            """)
-            
-            # Store ability metrics
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS ability_metrics (
-                    ability_id TEXT,
-                    timestamp TEXT,
-                    metric_type TEXT,
-                    metric_value REAL,
-                    FOREIGN KEY(ability_id) REFERENCES abilities(id)
+                self._index_contexts(ability_id)
+                
+            cursor.execute(_SQL_SELECT_CURRENT_METRICS)
+            for (ability_id, usage_count, success_count, avg_response_time,
+                 confidence, last_used) in cursor:
+                self._ability_metrics[ability_id] = AbilityMetrics(
+                    usage_count=usage_count,
+                    success_count=success_count,
+                    success_rate=success_count / usage_count if usage_count else 0.0,
+                    avg_response_time=avg_response_time,
+                    last_used=datetime.fromtimestamp(last_used / 1_000_000) if last_used else None,
+                    confidence_level=confidence
                 )
-            """)
+                
+        except Exception as e:
+            logger.error(f"Error loading abilities: {e}")
             
+    def _index_contexts(self, ability_id: str):
+        """Add an ability's context keys to the context key index"""
+        for ability_keys, _ in self._active_abilities[ability_id].context_sets:
+            for key in ability_keys:
+                self._context_key_index.setdefault(key, set()).add(ability_id)
+                
     async def register_ability(self, name: str, description: str,
                              ability_type: AbilityType,
                              handler: Optional[callable] = None,
                              requirements: Optional[Dict[str, Any]] = None,
                              metadata: Optional[Dict[str, Any]] = None) -> str:
         """Register a new ability"""
+        ability_ids = await self.register_abilities_bulk([{
+            'name': name,
+            'description': description,
+            'ability_type': ability_type,
+            'handler': handler,
+            'requirements': requirements,
+            'metadata': metadata
+        }])
+        return ability_ids[0] if ability_ids else ""
+        
+    async def register_abilities_bulk(self, specs: List[Dict[str, Any]]) -> List[str]:
+        """Register several abilities in a single transaction
+        
+        Each spec holds register_ability's arguments by name. Returns the new
+        ability ids in spec order, or an empty list if registration failed.
+        """
         try:
-            ability_id = f"ability_{datetime.now().isoformat()}"
-            now = datetime.now().isoformat()
-            
-            if metadata is None:
-                metadata = {}
-            if handler:
-                metadata['handler'] = handler.__name__
+            now = time.time_ns() // 1000  # Unix microseconds
             
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO abilities
-                    (id, name, description, ability_type, status, requirements,
-                     created_at, updated_at, metadata)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
+            abilities = []
+            rows = []
+            for spec in specs:
+                ability_id = f"ability_{uuid4().hex}"
+                handler = spec.get('handler')
+                metadata = spec.get('metadata')
+                if metadata is None:
+                    metadata = {}
+                if handler:
+                    metadata['handler'] = handler.__name__
+                    
+                abilities.append((ability_id, spec, metadata))
+                rows.append((
                     ability_id,
-                    name,
-                    description,
-                    ability_type.value,
+                    spec['name'],
+                    spec['description'],
+                    spec['ability_type'].value,
                     AbilityStatus.ACTIVE.value,
-                    json.dumps(requirements or {}),
+                    orjson.dumps(spec.get('requirements') or {}),
                     now,
                     now,
-                    json.dumps(metadata)
+                    orjson.dumps(metadata)
                 ))
                 
-            # Initialize metrics
-            self._ability_metrics[ability_id] = AbilityMetrics()
-            
-            # Add to active abilities
-            self._active_abilities[ability_id] = {
-                'id': ability_id,
-                'name': name,
-                'type': ability_type,
-                'status': AbilityStatus.ACTIVE,
-                'handler': handler
-            }
-            
-            return ability_id
+            async with self._write_lock:
+                conn = self._get_conn()
+                conn.execute("BEGIN")
+                try:
+                    conn.executemany(_SQL_INSERT_ABILITY, rows)
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+                    
+            for ability_id, spec, metadata in abilities:
+                # Initialize metrics
+                self._ability_metrics[ability_id] = AbilityMetrics()
+                
+                # Add to active abilities
+                self._active_abilities[ability_id] = _ActiveAbility(
+                    id=ability_id,
+                    name=spec['name'],
+                    type=spec['ability_type'],
+                    status=AbilityStatus.ACTIVE,
+                    handler=spec.get('handler'),
+                    metadata=metadata,
+                    context_sets=self._prepare_contexts(metadata.get('contexts', []))
+                )
+                self._index_contexts(ability_id)
+                
+            return [ability_id for ability_id, _, _ in abilities]
             
         except Exception as e:
             logger.error(f"Error registering ability: {e}")
-            return ""
+            return []
             
     async def update_ability_status(self, ability_id: str,
                                   status: AbilityStatus,
                                   reason: Optional[str] = None):
         """Update status of an ability"""
         try:
-            now = datetime.now().isoformat()
+            now = time.time_ns() // 1000
             metadata = {'status_change_reason': reason} if reason else {}
             
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    UPDATE abilities
-                    SET status = ?, updated_at = ?, metadata = ?
-                    WHERE id = ?
-                """, (
+            async with self._write_lock:
+                cursor = self._get_conn().cursor()
+                cursor.execute(_SQL_UPDATE_STATUS, (
                     status.value,
                     now,
-                    json.dumps(metadata),
+                    orjson.dumps(metadata),
                     ability_id
                 ))
                 
             if ability_id in self._active_abilities:
-                self._active_abilities[ability_id]['status'] = status
+                self._active_abilities[ability_id].status = status
                 
         except Exception as e:
             logger.error(f"Error updating ability status: {e}")
@@ -179,30 +429,22 @@ class AbilityAwareness:
                                context: Optional[Dict[str, Any]] = None):
         """Record usage of an ability"""
         try:
-            metrics = self._ability_metrics.get(ability_id)
-            if not metrics:
-                metrics = AbilityMetrics()
-                self._ability_metrics[ability_id] = metrics
+            # One dict probe on the hot path; first use creates the metrics
+            try:
+                metrics = self._ability_metrics[ability_id]
+            except KeyError:
+                metrics = self._ability_metrics[ability_id] = AbilityMetrics()
                 
             # Update metrics
             metrics.usage_count += 1
             metrics.last_used = datetime.now()
-            metrics.avg_response_time = (
-                (metrics.avg_response_time * (metrics.usage_count - 1) + response_time)
-                / metrics.usage_count
+            metrics.avg_response_time += (
+                (response_time - metrics.avg_response_time) / metrics.usage_count
             )
             
-            # Update success rate
-            if success:
-                metrics.success_rate = (
-                    (metrics.success_rate * (metrics.usage_count - 1) + 1)
-                    / metrics.usage_count
-                )
-            else:
-                metrics.success_rate = (
-                    metrics.success_rate * (metrics.usage_count - 1)
-                    / metrics.usage_count
-                )
+            # Update success rate from exact counts
+            metrics.success_count += int(success)
+            metrics.success_rate = metrics.success_count / metrics.usage_count
                 
             # Update confidence based on recent performance
             metrics.confidence_level = (
@@ -210,22 +452,35 @@ class AbilityAwareness:
                 0.3 * min(1.0, 1.0 / (metrics.avg_response_time + 1))
             )
             
-            # Store metrics in database
-            now = datetime.now().isoformat()
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                for metric_type, value in [
-                    ('usage_count', metrics.usage_count),
-                    ('success_rate', metrics.success_rate),
-                    ('response_time', response_time),
-                    ('confidence', metrics.confidence_level)
-                ]:
-                    cursor.execute("""
-                        INSERT INTO ability_metrics
-                        (ability_id, timestamp, metric_type, metric_value)
-                        VALUES (?, ?, ?, ?)
-                    """, (ability_id, now, metric_type, value))
-                    
+            # Buffer metrics for the database; they are written in batches.
+            # Only the latest state per ability is kept, plus a sampled history
+            now = time.time_ns() // 1000
+            self._dirty_metrics[ability_id] = (
+                ability_id,
+                metrics.usage_count,
+                metrics.success_count,
+                metrics.avg_response_time,
+                metrics.confidence_level,
+                now
+            )
+            if metrics.usage_count % self.METRICS_HISTORY_INTERVAL == 0:
+                self._metrics_buffer.extend(
+                    (ability_id, now, metric_type, value)
+                    for metric_type, value in (
+                        ('usage_count', metrics.usage_count),
+                        ('success_rate', metrics.success_rate),
+                        ('response_time', metrics.avg_response_time),
+                        ('confidence', metrics.confidence_level)
+                    )
+                )
+                
+            # A full batch is written now; otherwise a timer writes it shortly
+            pending = len(self._metrics_buffer) + len(self._dirty_metrics)
+            if pending >= self.METRICS_BATCH_SIZE:
+                await self._flush_metrics()
+            elif self._flush_task is None:
+                self._flush_task = asyncio.create_task(self._flush_later())
+                
         except Exception as e:
             logger.error(f"Error recording ability use: {e}")
             
@@ -239,34 +494,35 @@ class AbilityAwareness:
         try:
             relevant_abilities = []
             
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT id, name, description, ability_type, status, metadata
-                    FROM abilities
-                    WHERE status = ?
-                """, (AbilityStatus.ACTIVE.value,))
+            # Only abilities sharing a context key with the query can score
+            # above the 0.5 threshold, so the key index narrows the scan
+            candidates: Set[str] = set()
+            for key in context:
+                candidates |= self._context_key_index.get(key, set())
+                
+            # Served from the in-memory mirror; SQLite is only the durable store
+            for ability_id in candidates:
+                ability = self._active_abilities[ability_id]
+                if ability.status != AbilityStatus.ACTIVE:
+                    continue
+                    
+                metrics = self._ability_metrics.get(ability_id)
                 
-                for row in cursor.fetchall():
-                    ability_id = row[0]
-                    metrics = self._ability_metrics.get(ability_id)
+                if metrics and metrics.confidence_level >= min_confidence:
+                    relevance = self._calculate_ability_relevance(
+                        context,
+                        ability.context_sets
+                    )
                     
-                    if metrics and metrics.confidence_level >= min_confidence:
-                        metadata = json.loads(row[5])
-                        relevance = self._calculate_ability_relevance(
-                            context,
-                            metadata.get('contexts', [])
-                        )
+                    if relevance > 0.5:
+                        relevant_abilities.append({
+                            'id': ability_id,
+                            'name': ability.name,
+                            'type': ability.type.value,
+                            'confidence': metrics.confidence_level,
+                            'relevance': relevance
+                        })
                         
-                        if relevance > 0.5:
-                            relevant_abilities.append({
-                                'id': ability_id,
-                                'name': row[1],
-                                'type': row[3],
-                                'confidence': metrics.confidence_level,
-                                'relevance': relevance
-                            })
-                            
             return sorted(
                 relevant_abilities,
                 key=lambda x: x['relevance'] * x['confidence'],
@@ -277,35 +533,81 @@ class AbilityAwareness:
             logger.error(f"Error finding relevant abilities: {e}")
             return []
             
+    @staticmethod
+    def _prepare_contexts(ability_contexts: List[Dict[str, Any]]) -> List[tuple]:
+        """Precompute key sets and set-valued entries for ability contexts
+        
+        Ability contexts do not change after registration, so this runs once
+        per ability instead of on every relevance calculation.
+        """
+        return [
+            (
+                frozenset(ability_context.keys()),
+                {
+                    key: frozenset(value) if isinstance(value, (list, set)) else value
+                    for key, value in ability_context.items()
+                }
+            )
+            for ability_context in ability_contexts
+        ]
+        
     def _calculate_ability_relevance(self, current_context: Dict[str, Any],
-                                   ability_contexts: List[Dict[str, Any]]) -> float:
-        """Calculate relevance of ability to current context"""
+                                   ability_contexts: List[Any]) -> float:
+        """Calculate relevance of ability to current context
+        
+        ability_contexts may be raw context dicts or the output of
+        _prepare_contexts.
+        """
         try:
             if not ability_contexts:
                 return 0.5  # Default relevance for abilities without context
                 
+            if isinstance(ability_contexts[0], dict):
+                ability_contexts = self._prepare_contexts(ability_contexts)
+                
+            current_keys = current_context.keys()
+            current_sets: Dict[str, Set[Any]] = {}
+            
             max_relevance = 0.0
-            for ability_context in ability_contexts:
-                relevance = 0.0
-                common_keys = set(current_context.keys()) & set(ability_context.keys())
+            for ability_keys, ability_values in ability_contexts:
+                common_keys = current_keys & ability_keys
                 
                 if not common_keys:
                     continue
                     
+                # Each key adds at most 1.0, so stop scoring this context once
+                # even full marks on the remaining keys cannot beat the best
+                key_count = len(common_keys)
+                to_beat = max_relevance * key_count
+                remaining = key_count
+                relevance = 0.0
                 for key in common_keys:
-                    if isinstance(current_context[key], (str, int, float, bool)):
+                    remaining -= 1
+                    current_value = current_context[key]
+                    # isinstance so subclasses such as IntEnum score by equality
+                    if isinstance(current_value, (str, int, float, bool)):
                         relevance += (
-                            1.0 if current_context[key] == ability_context[key]
+                            1.0 if current_value == ability_values[key]
                             else 0.0
                         )
-                    elif isinstance(current_context[key], (list, set)):
-                        common = set(current_context[key]) & set(ability_context[key])
-                        total = set(current_context[key]) | set(ability_context[key])
+                    elif isinstance(current_value, (list, set)):
+                        current_set = current_sets.get(key)
+                        if current_set is None:
+                            current_set = current_sets[key] = set(current_value)
+                        ability_set = ability_values[key]
+                        if not isinstance(ability_set, frozenset):
+                            ability_set = set(ability_set)
+                        common = current_set & ability_set
+                        total = current_set | ability_set
                         relevance += len(common) / len(total) if total else 0.0
                         
-                relevance /= len(common_keys)
-                max_relevance = max(max_relevance, relevance)
-                
+                    if relevance + remaining <= to_beat:
+                        break
+                else:
+                    max_relevance = max(max_relevance, relevance / key_count)
+                    if max_relevance >= 1.0:
+                        break
+                        
             return max_relevance
             
         except Exception as e:
@@ -318,34 +620,27 @@ class AbilityAwareness:
         try:
             suggestions = []
             
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Find abilities often used in similar contexts
-                cursor.execute("""
-                    SELECT a.id, a.name, a.description, a.ability_type,
-                           COUNT(m.ability_id) as usage_count,
-                           AVG(m.metric_value) as avg_success
-                    FROM abilities a
-                    JOIN ability_metrics m ON a.id = m.ability_id
-                    WHERE a.id NOT IN ({})
-                    AND m.metric_type = 'success_rate'
-                    GROUP BY a.id
-                    HAVING avg_success >= 0.7
-                    ORDER BY usage_count DESC, avg_success DESC
-                    LIMIT 5
-                """.format(','.join(['?'] * len(current_abilities))),
-                    tuple(current_abilities))
+            # Usage is read from the current metrics table
+            await self._flush_metrics()
+            cursor = self._get_conn().cursor()
+            
+            # Find abilities often used in similar contexts; the exclusion list
+            # is bound as one JSON array so the statement text never changes
+            # (as text: json_each rejects BLOBs before SQLite 3.45)
+            cursor.execute(
+                _SQL_SELECT_SUGGESTIONS,
+                (orjson.dumps(list(current_abilities)).decode(),)
+            )
+            
+            for row in cursor:
+                suggestions.append({
+                    'id': row[0],
+                    'name': row[1],
+                    'description': row[2],
+                    'type': row[3],
+                    'confidence': row[5]
+                })
                 
-                for row in cursor.fetchall():
-                    suggestions.append({
-                        'id': row[0],
-                        'name': row[1],
-                        'description': row[2],
-                        'type': row[3],
-                        'confidence': row[5]
-                    })
-                    
             return suggestions
             
         except Exception as e:
@@ -5,8 +5,11 @@ Octavia's Cognitive Load Management System
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 from enum import Enum
+from collections import deque
 import psutil
 import time
+import asyncio
+from bisect import bisect_left
 from loguru import logger
 
 class ComplexityLevel(Enum):
@@ -17,7 +20,7 @@ class ComplexityLevel(Enum):
     COMPLEX = 4
     VERY_COMPLEX = 5
 
-@dataclass
+@dataclass(slots=True)
 class SystemLoad:
     """System resource usage metrics"""
     cpu_percent: float
@@ -25,7 +28,7 @@ class SystemLoad:
     disk_io: float
     active_tasks: int
 
-@dataclass
+@dataclass(slots=True)
 class UserLoad:
     """User cognitive load indicators"""
     task_complexity: ComplexityLevel
@@ -37,6 +40,29 @@ class UserLoad:
 class CognitiveLoadManager:
     """Manages system and user cognitive load"""
     
+    # Maximum tasks kept on the task stack
+    MAX_TASK_STACK = 64
+    
+    # Minimum seconds between system resource samples
+    SYSTEM_SAMPLE_INTERVAL = 0.5
+    
+    # Combined-load weights with the system (0.4) and user (0.6) shares and
+    # the percent/complexity normalisation folded in
+    _LOAD_WEIGHTS = (
+        0.3 / 100 * 0.4,  # cpu_percent
+        0.3 / 100 * 0.4,  # memory_percent
+        0.2 / 100 * 0.4,  # disk_io factor
+        0.2 / 100 * 0.4,  # active_tasks factor
+        0.3 / 5 * 0.6,    # task_complexity value
+        0.2 * 0.6,        # context_switches factor
+        0.2 * 0.6,        # error_rate
+        0.3 * 0.6,        # task_stack_depth factor
+    )
+    
+    # Chunk sizes indexed by how many thresholds the combined load exceeds
+    _CHUNK_THRESHOLDS = (0.4, 0.6, 0.8)
+    _CHUNK_SIZES = (20, 15, 10, 5)
+    
     def __init__(self):
         self._system_load = SystemLoad(0.0, 0.0, 0.0, 0)
         self._user_load = UserLoad(
@@ -46,13 +72,46 @@ class CognitiveLoadManager:
             0.0,
             0
         )
-        self._task_stack: List[Dict[str, Any]] = []
+        # Bounded so unmatched pushes drop the oldest tasks
+        self._task_stack: deque = deque(maxlen=self.MAX_TASK_STACK)
+        self._task_depth = 0
         self._last_update = time.time()
+        self._last_sys_sample_t = float("-inf")
+        self._sampler_task: Optional[asyncio.Task] = None
         
+    def start_sampler(self):
+        """Start sampling system load in the background on the running loop"""
+        if self._sampler_task is None or self._sampler_task.done():
+            self._sampler_task = asyncio.create_task(self._sys_sampler_loop())
+            
+    def stop_sampler(self):
+        """Stop the background system load sampler"""
+        if self._sampler_task is not None:
+            self._sampler_task.cancel()
+            self._sampler_task = None
+            
+    async def _sys_sampler_loop(self):
+        """Refresh system load every SYSTEM_SAMPLE_INTERVAL seconds"""
+        # The first non-blocking reading has no baseline and is always 0.0
+        psutil.cpu_percent(interval=None)
+        while True:
+            await asyncio.sleep(self.SYSTEM_SAMPLE_INTERVAL)
+            await self.update_system_load()
+            
     async def update_system_load(self):
-        """Update system load metrics"""
+        """Update system load metrics
+        
+        Samples are rate limited to one per SYSTEM_SAMPLE_INTERVAL; calls in
+        between keep the previous sample.
+        """
         try:
-            cpu = psutil.cpu_percent(interval=0.1)
+            now = time.monotonic()
+            if now - self._last_sys_sample_t < self.SYSTEM_SAMPLE_INTERVAL:
+                return
+            self._last_sys_sample_t = now
+            
+            # Non-blocking: CPU usage since the previous call
+            cpu = psutil.cpu_percent(interval=None)
             memory = psutil.virtual_memory().percent
             disk = psutil.disk_io_counters()
             disk_io = (disk.read_bytes + disk.write_bytes) / 1024 / 1024  # MB
@@ -61,7 +120,7 @@ class CognitiveLoadManager:
                 cpu_percent=cpu,
                 memory_percent=memory,
                 disk_io=disk_io,
-                active_tasks=len(self._task_stack)
+                active_tasks=self._task_depth
             )
         except Exception as e:
             logger.error(f"Error updating system load: {e}")
@@ -89,7 +148,7 @@ class CognitiveLoadManager:
                     self._user_load.response_time * 0.9 + response_time * 0.1
                 )
                 
-            self._user_load.task_stack_depth = len(self._task_stack)
+            self._user_load.task_stack_depth = self._task_depth
             
         except Exception as e:
             logger.error(f"Error updating user load: {e}")
@@ -97,32 +156,32 @@ class CognitiveLoadManager:
     def push_task(self, task: Dict[str, Any]):
         """Add task to stack"""
         self._task_stack.append(task)
+        if self._task_depth < self.MAX_TASK_STACK:
+            self._task_depth += 1
         
     def pop_task(self) -> Optional[Dict[str, Any]]:
         """Remove and return top task"""
-        return self._task_stack.pop() if self._task_stack else None
+        if not self._task_depth:
+            return None
+        self._task_depth -= 1
+        return self._task_stack.pop()
         
     def get_combined_load(self) -> float:
         """Calculate combined cognitive load (0-1)"""
-        # System load factors
-        system_load = (
-            self._system_load.cpu_percent * 0.3 +
-            self._system_load.memory_percent * 0.3 +
-            min(self._system_load.disk_io / 100, 1.0) * 0.2 +
-            min(self._system_load.active_tasks / 5, 1.0) * 0.2
-        ) / 100  # Normalize to 0-1
-        
-        # User load factors
-        user_load = (
-            self._user_load.task_complexity.value / 5 * 0.3 +
-            min(self._user_load.context_switches / 10, 1.0) * 0.2 +
-            self._user_load.error_rate * 0.2 +
-            min(self._user_load.task_stack_depth / 5, 1.0) * 0.3
+        w_cpu, w_mem, w_disk, w_tasks, w_cx, w_cs, w_err, w_depth = self._LOAD_WEIGHTS
+        system = self._system_load
+        user = self._user_load
+        return (
+            system.cpu_percent * w_cpu +
+            system.memory_percent * w_mem +
+            min(system.disk_io / 100, 1.0) * w_disk +
+            min(system.active_tasks / 5, 1.0) * w_tasks +
+            user.task_complexity.value * w_cx +
+            min(user.context_switches / 10, 1.0) * w_cs +
+            user.error_rate * w_err +
+            min(user.task_stack_depth / 5, 1.0) * w_depth
         )
         
-        # Combine loads with weights
-        return system_load * 0.4 + user_load * 0.6
-        
     def should_break_task(self) -> bool:
         """Determine if current task should be broken down"""
         combined_load = self.get_combined_load()
@@ -132,17 +191,8 @@ class CognitiveLoadManager:
         
     def get_optimal_chunk_size(self) -> int:
         """Calculate optimal chunk size for information"""
-        combined_load = self.get_combined_load()
-        base_chunk = 5  # Base chunk size
-        
-        if combined_load > 0.8:
-            return base_chunk
-        elif combined_load > 0.6:
-            return base_chunk * 2
-        elif combined_load > 0.4:
-            return base_chunk * 3
-        else:
-            return base_chunk * 4
+        # Loads above 0.4/0.6/0.8 step the chunk size down from 20 to 5
+        return self._CHUNK_SIZES[bisect_left(self._CHUNK_THRESHOLDS, self.get_combined_load())]
             
     def suggest_break(self) -> bool:
         """Suggest if user needs a break"""
@@ -28,39 +28,47 @@ class Consciousness:
         
     async def initialize(self):
         """Initialize consciousness components asynchronously"""
+        self.cognitive_load.start_sampler()
         if not self._abilities_registered:
             await self._register_abilities()
             self._abilities_registered = True
         
+    async def aclose(self):
+        """Flush pending state and release resources at shutdown"""
+        self.cognitive_load.stop_sampler()
+        await self.abilities.aclose()
+        # Waits for queued task queries before closing the connections
+        await asyncio.to_thread(self.task_awareness.close)
+        
     async def _register_abilities(self):
         """Register core abilities"""
         try:
-            # File Management
-            await self.abilities.register_ability(
-                name="File Navigation",
-                description="Navigate and manage filesystem",
-                ability_type=AbilityType.ACTION,
-                requirements={"filesystem": "read_write"},
-                metadata={"domain": "file_management"}
-            )
-            
-            # Pattern Recognition
-            await self.abilities.register_ability(
-                name="Pattern Recognition",
-                description="Identify patterns in user behavior and files",
-                ability_type=AbilityType.COGNITIVE,
-                requirements={"memory": "pattern_tracking"},
-                metadata={"domain": "analysis"}
-            )
-            
-            # Context Awareness
-            await self.abilities.register_ability(
-                name="Context Awareness",
-                description="Maintain and use contextual information",
-                ability_type=AbilityType.COGNITIVE,
-                requirements={"memory": "context_tracking"},
-                metadata={"domain": "awareness"}
-            )
+            await self.abilities.register_abilities_bulk([
+                # File Management
+                {
+                    "name": "File Navigation",
+                    "description": "Navigate and manage filesystem",
+                    "ability_type": AbilityType.ACTION,
+                    "requirements": {"filesystem": "read_write"},
+                    "metadata": {"domain": "file_management"}
+                },
+                # Pattern Recognition
+                {
+                    "name": "Pattern Recognition",
+                    "description": "Identify patterns in user behavior and files",
+                    "ability_type": AbilityType.COGNITION,
+                    "requirements": {"memory": "pattern_tracking"},
+                    "metadata": {"domain": "analysis"}
+                },
+                # Context Awareness
+                {
+                    "name": "Context Awareness",
+                    "description": "Maintain and use contextual information",
+                    "ability_type": AbilityType.COGNITION,
+                    "requirements": {"memory": "context_tracking"},
+                    "metadata": {"domain": "awareness"}
+                }
+            ])
             
         except Exception as e:
             logger.error(f"Error registering abilities: {e}")
@@ -68,27 +76,27 @@ class Consciousness:
     async def process_input(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process input through consciousness system"""
         try:
-            # Update cognitive load
-            await self.cognitive_load.update_load(input_data)
-            
-            # Track context
-            context_id = await self.context.add_context(
-                "user_input",
-                {"content": input_data, "timestamp": datetime.now().isoformat()}
-            )
-            
-            # Update memory patterns
-            await self.memory_patterns.track_interaction(
-                "input_processing",
-                {"type": input_data.get("type"), "context_id": context_id}
+            # Update cognitive load and track context concurrently
+            _, context_id = await asyncio.gather(
+                self.cognitive_load.update_load(input_data),
+                self.context.add_context(
+                    "user_input",
+                    {"content": input_data, "timestamp": datetime.now().isoformat()}
+                )
             )
             
-            # Create task
-            task_id = await self.task_awareness.create_task(
-                name="Process Input",
-                description="Process user input and generate response",
-                priority=TaskPriority.HIGH,
-                metadata={"context_id": context_id}
+            # Update memory patterns and create task; both only need context_id
+            _, task_id = await asyncio.gather(
+                self.memory_patterns.track_interaction(
+                    "input_processing",
+                    {"type": input_data.get("type"), "context_id": context_id}
+                ),
+                self.task_awareness.create_task(
+                    name="Process Input",
+                    description="Process user input and generate response",
+                    priority=TaskPriority.HIGH,
+                    metadata={"context_id": context_id}
+                )
             )
             
             # Process with abilities
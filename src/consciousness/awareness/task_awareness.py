@@ -5,11 +5,217 @@ Octavia's Task Awareness System - Manages and tracks tasks and their relationshi
 from typing import Dict, List, Optional, Any, Set
 from datetime import datetime, timedelta
 from enum import Enum
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import asyncio
+import heapq
+import itertools
+import queue
 import sqlite3
+import time
 from pathlib import Path
-import json
+import orjson
 from loguru import logger
 
+# Statements reused on every call, defined once so each call passes the same
+# string to the connection's statement cache
+_SQL_INSERT_TASK = """
+    INSERT INTO tasks
+    (id, title, description, status, priority, created_at, updated_at, metadata)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_DEPENDENCY = """
+    INSERT INTO task_dependencies
+    (task_id, depends_on)
+    VALUES (?, ?)
+"""
+
+_SQL_INSERT_CONTEXT = """
+    INSERT INTO task_context
+    (task_id, context_type, context_data)
+    VALUES (?, ?, ?)
+"""
+
+_SQL_UPDATE_STATUS = """
+    UPDATE tasks
+    SET status = ?, updated_at = ?, completed_at = ?, metadata = ?
+    WHERE id = ?
+"""
+
+_SQL_SELECT_CONTEXT_TYPES = """
+    SELECT context_type FROM task_context WHERE task_id = ?
+"""
+
+# Every task reachable from the root, each once (UNION drops repeats, so
+# shared dependencies are not re-expanded), with its dependency ids in
+# insertion order for the depth-first walk in _get_task_chain_sync
+_SQL_SELECT_CHAIN = """
+    WITH RECURSIVE reach(id) AS (
+        SELECT ?
+        UNION
+        SELECT td.depends_on
+        FROM task_dependencies td
+        JOIN reach ON td.task_id = reach.id
+    )
+    SELECT t.id, t.title, t.description, t.status, t.priority, t.created_at,
+           (SELECT json_group_object(tc.context_type, json(tc.context_data))
+            FROM task_context tc
+            WHERE tc.task_id = t.id),
+           (SELECT json_group_array(depends_on)
+            FROM (SELECT depends_on FROM task_dependencies
+                  WHERE task_id = t.id ORDER BY rowid))
+    FROM reach
+    JOIN tasks t ON t.id = reach.id
+"""
+
+# Scalar and flat-array values are scored inside SQLite: equality for
+# scalars, Jaccard over distinct elements for arrays. Rows scored NULL
+# (nested values, or shapes only the Python scorer handles) carry their
+# context_data back so _canon_relevance can finish them.
+_SQL_SELECT_RELATED = """
+    WITH needle(key, value, type) AS (
+        SELECT key, value, type FROM json_each(?)
+        UNION ALL
+        SELECT value, NULL, 'fallback' FROM json_each(?)
+    ),
+    scored AS (
+        SELECT tc.task_id, tc.context_type, tc.context_data,
+            CASE
+                WHEN n.type = 'fallback' THEN NULL
+                WHEN n.type = 'null' THEN 0.0
+                WHEN n.type = 'array' THEN
+                    CASE json_type(tc.context_data)
+                        WHEN 'array' THEN
+                            CASE
+                                WHEN EXISTS (
+                                    SELECT 1 FROM json_each(tc.context_data)
+                                    WHERE type IN ('array', 'object')
+                                ) THEN 0.0
+                                ELSE coalesce((
+                                    SELECT COUNT(*) FROM (
+                                        SELECT atom FROM json_each(n.value)
+                                        INTERSECT
+                                        SELECT atom FROM json_each(tc.context_data)
+                                    )
+                                ) * 1.0 / nullif((
+                                    SELECT COUNT(*) FROM (
+                                        SELECT atom FROM json_each(n.value)
+                                        UNION
+                                        SELECT atom FROM json_each(tc.context_data)
+                                    )
+                                ), 0), 0.0)
+                            END
+                        WHEN 'object' THEN NULL
+                        WHEN 'text' THEN NULL
+                        ELSE 0.0
+                    END
+                WHEN json_type(tc.context_data) IN ('array', 'object', 'null') THEN 0.0
+                ELSE (json_extract(tc.context_data, '$') = n.value) * 1.0
+            END AS score
+        FROM needle n
+        JOIN task_context tc ON tc.context_type = n.key
+    )
+    SELECT t.id, t.title, t.status, t.priority, s.context_type, s.score,
+           CASE WHEN s.score IS NULL THEN s.context_data END
+    FROM scored s
+    JOIN tasks t ON t.id = s.task_id
+    WHERE t.status != ?
+    ORDER BY t.updated_at DESC, t.id
+    LIMIT ?
+"""
+
+_SQL_SCALARS = (str, int, float, bool)
+
+class _FrozenDict(frozenset):
+    """Hashable stand-in for a context dict, as a set of (key, value) items"""
+
+
+# Marks a list or set whose elements cannot be hashed; it never matches
+_UNHASHABLE = object()
+
+
+def _canon(value: Any) -> Any:
+    """Convert a context value to a hashable form for the relevance cache"""
+    if isinstance(value, dict):
+        return _FrozenDict((key, _canon(item)) for key, item in value.items())
+    if isinstance(value, (list, set)):
+        try:
+            return frozenset(value)
+        except TypeError:
+            return _UNHASHABLE
+    return value
+
+
+def _scalar_relevance(context1: Any, context2: Any) -> float:
+    """Scalars match only when equal"""
+    return float(context1 == context2)
+
+
+def _set_relevance(context1: frozenset, context2: Any) -> float:
+    """Jaccard similarity of two canonical collections"""
+    try:
+        other = (frozenset(key for key, _ in context2)
+                 if isinstance(context2, _FrozenDict) else frozenset(context2))
+    except TypeError:
+        return 0.0
+    total = context1 | other
+    return len(context1 & other) / len(total) if total else 0.0
+
+
+def _dict_relevance(context1: _FrozenDict, context2: Any) -> float:
+    """Mean relevance over the keys both dicts share"""
+    if not isinstance(context2, _FrozenDict):
+        return 0.0
+    items2 = dict(context2)
+    relevance = 0.0
+    common = 0
+    for key, value in context1:
+        if key in items2:
+            relevance += _canon_relevance(value, items2[key])
+            common += 1
+    return relevance / common if common else 0.0
+
+
+# Exact-type dispatch for canonical values; anything else scores 0.0
+_RELEVANCE_HANDLERS = {
+    str: _scalar_relevance,
+    int: _scalar_relevance,
+    float: _scalar_relevance,
+    bool: _scalar_relevance,
+    frozenset: _set_relevance,
+    _FrozenDict: _dict_relevance
+}
+
+
+@lru_cache(maxsize=4096, typed=True)
+def _canon_relevance(context1: Any, context2: Any) -> float:
+    """Relevance between two canonical context values, memoized"""
+    handler = _RELEVANCE_HANDLERS.get(type(context1))
+    if handler is not None:
+        return handler(context1, context2)
+    if isinstance(context1, _SQL_SCALARS):
+        # Subclasses such as str-valued enums
+        return _scalar_relevance(context1, context2)
+    return 0.0
+
+
+def _offer_related(heap: List[tuple], task: Dict[str, Any], limit: int, seq: int):
+    """Keep a scored task if it is among the `limit` most relevant so far"""
+    relevance = task['relevance'] / task.pop('matches')
+    if relevance <= 0.5:
+        return
+    task['relevance'] = relevance
+    # Earlier tasks win ties; seq also keeps dicts out of tuple comparison
+    entry = (relevance, -seq, task)
+    if len(heap) < limit:
+        heapq.heappush(heap, entry)
+    else:
+        heapq.heappushpop(heap, entry)
+
+
 class TaskStatus(Enum):
     """Task status states"""
     PENDING = "pending"
@@ -28,17 +234,104 @@ class TaskPriority(Enum):
 class TaskAwareness:
     """Manages task awareness and relationships"""
     
+    # Read-only connections kept open alongside the single writer
+    READ_POOL_SIZE = 4
+    
+    # In-memory working set; finished tasks leave it, the oldest are evicted
+    MAX_ACTIVE_TASKS = 1024
+    
+    # Related-task results kept per (context, context type versions)
+    RELATED_CACHE_SIZE = 256
+    RELATED_FETCH_SIZE = 128
+    
     def __init__(self, db_path: Optional[str] = None):
         if db_path is None:
             db_path = Path.home() / ".octavia" / "tasks.db"
+        db_path = Path(db_path)
         db_path.parent.mkdir(parents=True, exist_ok=True)
         self.db_path = db_path
+        
+        # SQLite allows one writer at a time; WAL lets readers run alongside it
+        self._write_conn = self._open_connection()
+        self._write_lock = asyncio.Lock()
         self._init_database()
-        self._active_tasks: Dict[str, Dict[str, Any]] = {}
+        
+        self._read_pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(self.READ_POOL_SIZE):
+            self._read_pool.put(self._open_connection(read_only=True))
+            
+        # One worker per read connection so pooled reads can run in parallel
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.READ_POOL_SIZE,
+            thread_name_prefix="task-db"
+        )
+            
+        self._active_tasks: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        
+        # Millisecond start time in the high bits keeps ids unique across
+        # restarts; the low 20 bits count tasks created since then
+        self._id_counter = itertools.count(int(time.time() * 1000) << 20)
+        
+        # Writes bump the version of each context type they touch, so cached
+        # related-task results for those types stop matching
+        self._ctx_version: Dict[str, int] = defaultdict(int)
+        self._related_cache: "OrderedDict[tuple, List[Dict[str, Any]]]" = OrderedDict()
+        
+    def _open_connection(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a tuned connection to the task database"""
+        if read_only:
+            conn = sqlite3.connect(
+                f"{self.db_path.resolve().as_uri()}?mode=ro",
+                uri=True,
+                isolation_level=None,
+                cached_statements=512,
+                check_same_thread=False
+            )
+        else:
+            conn = sqlite3.connect(
+                self.db_path,
+                isolation_level=None,
+                cached_statements=512,
+                check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA cache_size=-65536")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+        
+    @contextmanager
+    def _acquire_read(self):
+        """Borrow a read-only connection from the pool"""
+        conn = self._read_pool.get()
+        try:
+            yield conn
+        finally:
+            self._read_pool.put(conn)
+            
+    @contextmanager
+    def _write_transaction(self):
+        """Run a block inside a BEGIN IMMEDIATE transaction on the writer"""
+        conn = self._write_conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+            
+    def close(self):
+        """Close the writer and every pooled read connection"""
+        self._executor.shutdown(wait=True)
+        while not self._read_pool.empty():
+            self._read_pool.get_nowait().close()
+        self._write_conn.close()
         
     def _init_database(self):
         """Initialize the task database"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._write_transaction() as conn:
             cursor = conn.cursor()
             
             # Store tasks
@@ -76,52 +369,45 @@ class TaskAwareness:
                 )
             """)
             
+            # Index the related-task filter, chain traversal and the
+            # per-task context lookup
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_ctx_type_task
+                ON task_context(context_type, task_id)
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_ctx_task ON task_context(task_id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_dep_task ON task_dependencies(task_id)")
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_tasks_status_updated
+                ON tasks(status, updated_at DESC)
+            """)
+            
+            # Gather planner statistics once; later sessions reuse them
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                cursor.execute("ANALYZE")
+                
+    async def _run(self, func, *args):
+        """Run blocking database work on the executor, off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+        
     async def create_task(self, title: str, description: str,
                          priority: TaskPriority = TaskPriority.MEDIUM,
                          depends_on: Optional[List[str]] = None,
                          context: Optional[Dict[str, Any]] = None) -> str:
         """Create a new task"""
         try:
-            task_id = f"task_{datetime.now().isoformat()}"
+            task_id = f"task_{next(self._id_counter)}"
             now = datetime.now().isoformat()
             
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Create task
-                cursor.execute("""
-                    INSERT INTO tasks
-                    (id, title, description, status, priority, created_at, updated_at, metadata)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    task_id,
-                    title,
-                    description,
-                    TaskStatus.PENDING.value,
-                    priority.value,
-                    now,
-                    now,
-                    "{}"
-                ))
+            async with self._write_lock:
+                await self._run(
+                    self._create_task_sync,
+                    task_id, title, description, priority, depends_on, context, now
+                )
+            self._invalidate_related(context or ())
                 
-                # Add dependencies
-                if depends_on:
-                    for dep in depends_on:
-                        cursor.execute("""
-                            INSERT INTO task_dependencies
-                            (task_id, depends_on)
-                            VALUES (?, ?)
-                        """, (task_id, dep))
-                        
-                # Add context
-                if context:
-                    for context_type, context_data in context.items():
-                        cursor.execute("""
-                            INSERT INTO task_context
-                            (task_id, context_type, context_data)
-                            VALUES (?, ?, ?)
-                        """, (task_id, context_type, json.dumps(context_data)))
-                        
             # Add to active tasks
             self._active_tasks[task_id] = {
                 'id': task_id,
@@ -130,6 +416,8 @@ class TaskAwareness:
                 'priority': priority,
                 'context': context or {}
             }
+            if len(self._active_tasks) > self.MAX_ACTIVE_TASKS:
+                self._active_tasks.popitem(last=False)
             
             return task_id
             
@@ -137,6 +425,41 @@ class TaskAwareness:
             logger.error(f"Error creating task: {e}")
             return ""
             
+    def _create_task_sync(self, task_id: str, title: str, description: str,
+                          priority: TaskPriority,
+                          depends_on: Optional[List[str]],
+                          context: Optional[Dict[str, Any]],
+                          now: str):
+        """Insert a task with its dependencies and context"""
+        # Build every row before BEGIN so serialization errors never open a
+        # transaction and SQLite's write lock is held only for the inserts.
+        # JSON is stored as text: SQLite's json functions reject BLOBs
+        # before 3.45
+        dependency_rows = [(task_id, dep) for dep in depends_on or ()]
+        context_rows = [
+            (task_id, context_type, orjson.dumps(context_data).decode())
+            for context_type, context_data in (context or {}).items()
+        ]
+        
+        with self._write_transaction() as conn:
+            cursor = conn.cursor()
+            
+            # Create task
+            cursor.execute(_SQL_INSERT_TASK, (
+                task_id,
+                title,
+                description,
+                TaskStatus.PENDING.value,
+                priority.value,
+                now,
+                now,
+                "{}"
+            ))
+            
+            # Add dependencies and context
+            cursor.executemany(_SQL_INSERT_DEPENDENCY, dependency_rows)
+            cursor.executemany(_SQL_INSERT_CONTEXT, context_rows)
+            
     async def update_task_status(self, task_id: str, 
                                status: TaskStatus,
                                metadata: Optional[Dict[str, Any]] = None):
@@ -145,155 +468,185 @@ class TaskAwareness:
             now = datetime.now().isoformat()
             completed_at = now if status == TaskStatus.COMPLETED else None
             
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    UPDATE tasks
-                    SET status = ?, updated_at = ?, completed_at = ?, metadata = ?
-                    WHERE id = ?
-                """, (
-                    status.value,
-                    now,
-                    completed_at,
-                    json.dumps(metadata or {}),
-                    task_id
-                ))
+            async with self._write_lock:
+                context_types = await self._run(
+                    self._update_task_sync,
+                    task_id, status, completed_at, metadata, now
+                )
+            self._invalidate_related(context_types)
                 
-            if task_id in self._active_tasks:
+            if status in (TaskStatus.COMPLETED, TaskStatus.FAILED):
+                self._active_tasks.pop(task_id, None)
+            elif task_id in self._active_tasks:
                 self._active_tasks[task_id]['status'] = status
+                self._active_tasks.move_to_end(task_id)
                 
         except Exception as e:
             logger.error(f"Error updating task: {e}")
             
+    def _update_task_sync(self, task_id: str, status: TaskStatus,
+                          completed_at: Optional[str],
+                          metadata: Optional[Dict[str, Any]],
+                          now: str):
+        """Write a task's new status and return its context types"""
+        with self._write_transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_SQL_UPDATE_STATUS, (
+                status.value,
+                now,
+                completed_at,
+                orjson.dumps(metadata or {}).decode(),
+                task_id
+            ))
+            cursor.execute(_SQL_SELECT_CONTEXT_TYPES, (task_id,))
+            return [row[0] for row in cursor]
+            
     async def get_task_chain(self, task_id: str) -> List[Dict[str, Any]]:
         """Get task and its dependencies"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                def get_dependencies(tid: str, chain: Set[str]) -> List[Dict[str, Any]]:
-                    if tid in chain:  # Prevent cycles
-                        return []
-                        
-                    chain.add(tid)
-                    cursor.execute("""
-                        SELECT t.*, GROUP_CONCAT(tc.context_type || ':' || tc.context_data)
-                        FROM tasks t
-                        LEFT JOIN task_context tc ON t.id = tc.task_id
-                        WHERE t.id = ?
-                        GROUP BY t.id
-                    """, (tid,))
-                    
-                    task_row = cursor.fetchone()
-                    if not task_row:
-                        return []
-                        
-                    task = {
-                        'id': task_row[0],
-                        'title': task_row[1],
-                        'description': task_row[2],
-                        'status': task_row[3],
-                        'priority': task_row[4],
-                        'created_at': task_row[5],
-                        'context': self._parse_context(task_row[8]) if task_row[8] else {}
-                    }
-                    
-                    # Get dependencies
-                    cursor.execute("""
-                        SELECT depends_on FROM task_dependencies WHERE task_id = ?
-                    """, (tid,))
-                    
-                    deps = []
-                    for dep_row in cursor.fetchall():
-                        deps.extend(get_dependencies(dep_row[0], chain))
-                        
-                    return [task] + deps
-                    
-                return get_dependencies(task_id, set())
-                
+            return await self._run(self._get_task_chain_sync, task_id)
+            
         except Exception as e:
             logger.error(f"Error getting task chain: {e}")
             return []
             
-    def _parse_context(self, context_str: str) -> Dict[str, Any]:
-        """Parse context string into dictionary"""
-        try:
-            if not context_str:
-                return {}
-                
-            context = {}
-            for item in context_str.split(','):
-                if ':' in item:
-                    type_str, data_str = item.split(':', 1)
-                    context[type_str] = json.loads(data_str)
-            return context
+    def _get_task_chain_sync(self, task_id: str) -> List[Dict[str, Any]]:
+        """Read a task and its dependencies on a pooled read connection
+        
+        One recursive query fetches every reachable task once; the
+        depth-first pre-order is then rebuilt from each task's dependency
+        list, visiting each task once and skipping cycles.
+        """
+        with self._acquire_read() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_SQL_SELECT_CHAIN, (task_id,))
+            rows = {row[0]: row for row in cursor}
             
-        except Exception as e:
-            logger.error(f"Error parsing context: {e}")
-            return {}
+        chain = []
+        seen: Set[str] = set()
+        stack = [task_id]
+        while stack:
+            tid = stack.pop()
+            if tid in seen:
+                continue
+            seen.add(tid)
+            row = rows.get(tid)
+            if row is None:
+                continue
+            chain.append({
+                'id': row[0],
+                'title': row[1],
+                'description': row[2],
+                'status': row[3],
+                'priority': row[4],
+                'created_at': row[5],
+                'context': orjson.loads(row[6]) if row[6] else {}
+            })
+            # Reversed so the first dependency is expanded first
+            stack.extend(reversed(orjson.loads(row[7])))
             
+        return chain
+        
     async def get_related_tasks(self, context: Dict[str, Any],
                               limit: int = 5) -> List[Dict[str, Any]]:
         """Get tasks related to given context"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Find tasks with similar context
-                tasks = []
-                for context_type, context_data in context.items():
-                    cursor.execute("""
-                        SELECT t.*, tc.context_data
-                        FROM tasks t
-                        JOIN task_context tc ON t.id = tc.task_id
-                        WHERE tc.context_type = ?
-                        AND t.status != ?
-                        ORDER BY t.updated_at DESC
-                        LIMIT ?
-                    """, (context_type, TaskStatus.COMPLETED.value, limit))
-                    
-                    for row in cursor.fetchall():
-                        task_context = json.loads(row[8]) if row[8] else {}
-                        relevance = self._calculate_context_relevance(
-                            context_data, json.loads(row[-1])
-                        )
-                        
-                        if relevance > 0.5:
-                            tasks.append({
-                                'id': row[0],
-                                'title': row[1],
-                                'status': row[3],
-                                'priority': row[4],
-                                'relevance': relevance
-                            })
-                            
-                return sorted(tasks, key=lambda x: x['relevance'], reverse=True)[:limit]
+            try:
+                key = (
+                    orjson.dumps(context, option=orjson.OPT_SORT_KEYS),
+                    tuple(sorted((ctype, self._ctx_version.get(ctype, 0)) for ctype in context)),
+                    limit
+                )
+            except TypeError:
+                # Values orjson cannot encode are scored without caching
+                return await self._run(self._get_related_tasks_sync, context, limit)
                 
+            cached = self._related_cache.get(key)
+            if cached is None:
+                cached = await self._run(self._get_related_tasks_sync, context, limit)
+                self._related_cache[key] = cached
+                if len(self._related_cache) > self.RELATED_CACHE_SIZE:
+                    self._related_cache.popitem(last=False)
+            else:
+                self._related_cache.move_to_end(key)
+            return [dict(task) for task in cached]
+            
         except Exception as e:
             logger.error(f"Error getting related tasks: {e}")
             return []
             
+    def _invalidate_related(self, context_types):
+        """Bump the version of each context type touched by a write"""
+        for context_type in context_types:
+            self._ctx_version[context_type] += 1
+            
+    def _get_related_tasks_sync(self, context: Dict[str, Any],
+                                limit: int) -> List[Dict[str, Any]]:
+        """Score tasks against a context on a pooled read connection"""
+        if not context:
+            return []
+            
+        # Split the query context into values SQLite can score and those
+        # left to the Python scorer
+        sql_needle = {}
+        fallback = []
+        for context_type, value in context.items():
+            if value is None or isinstance(value, _SQL_SCALARS):
+                sql_needle[context_type] = value
+            elif isinstance(value, (list, set)) and all(
+                item is None or isinstance(item, _SQL_SCALARS) for item in value
+            ):
+                sql_needle[context_type] = list(value)
+            else:
+                fallback.append(context_type)
+                
+        with self._acquire_read() as conn:
+            cursor = conn.cursor()
+            
+            # Every context type is matched by one query, with the needle
+            # bound as a single JSON object
+            cursor.execute(_SQL_SELECT_RELATED, (
+                orjson.dumps(sql_needle).decode(),
+                orjson.dumps(fallback).decode(),
+                TaskStatus.COMPLETED.value,
+                limit * len(context)
+            ))
+            
+            # Rows arrive grouped by task, so each task is scored once its
+            # last row is read and offered to a heap of the best `limit`
+            cursor.arraysize = self.RELATED_FETCH_SIZE
+            heap: List[tuple] = []
+            order = itertools.count()
+            task = None
+            for rows in iter(cursor.fetchmany, []):
+                for task_id, title, status, priority, context_type, score, context_data in rows:
+                    if task is None or task['id'] != task_id:
+                        if task is not None:
+                            _offer_related(heap, task, limit, next(order))
+                        task = {
+                            'id': task_id,
+                            'title': title,
+                            'status': status,
+                            'priority': priority,
+                            'relevance': 0.0,
+                            'matches': 0
+                        }
+                    if score is None:
+                        score = _canon_relevance(
+                            _canon(context[context_type]),
+                            _canon(orjson.loads(context_data))
+                        )
+                    task['relevance'] += score
+                    task['matches'] += 1
+            if task is not None:
+                _offer_related(heap, task, limit, next(order))
+                
+        return [entry[2] for entry in sorted(heap, reverse=True)]
+        
     def _calculate_context_relevance(self, context1: Any, context2: Any) -> float:
         """Calculate relevance between two context values"""
         try:
-            if isinstance(context1, (str, int, float, bool)):
-                return 1.0 if context1 == context2 else 0.0
-            elif isinstance(context1, (list, set)):
-                common = set(context1) & set(context2)
-                total = set(context1) | set(context2)
-                return len(common) / len(total) if total else 0.0
-            elif isinstance(context1, dict):
-                relevance = 0.0
-                common_keys = set(context1.keys()) & set(context2.keys())
-                if not common_keys:
-                    return 0.0
-                for key in common_keys:
-                    relevance += self._calculate_context_relevance(
-                        context1[key], context2[key]
-                    )
-                return relevance / len(common_keys)
-            return 0.0
-            
+            return _canon_relevance(_canon(context1), _canon(context2))
         except Exception as e:
             logger.error(f"Error calculating relevance: {e}")
             return 0.0
@@ -3,7 +3,9 @@ Octavia's UI Abilities Registration - Defines and registers UI-related capabilit
 """
 
 from typing import Dict, Any, List
+from collections import defaultdict, deque
 from datetime import datetime
+import time
 from .abilities_awareness import AbilityAwareness, AbilityType, AbilityStatus
 from loguru import logger
 
@@ -16,17 +18,13 @@ class UIAbilitiesRegistrar:
     async def register_ui_abilities(self):
         """Register all UI-related abilities"""
         try:
-            # Register window management
-            await self._register_window_management()
-            
-            # Register layout abilities
-            await self._register_layout_abilities()
-            
-            # Register interaction awareness
-            await self._register_interaction_awareness()
-            
-            # Register mouse tracking
-            await self._register_mouse_tracking()
+            # One bulk call so all UI abilities share a single transaction
+            await self.ability_awareness.register_abilities_bulk([
+                self._window_management_spec(),
+                self._layout_adaptation_spec(),
+                self._interaction_context_spec(),
+                self._mouse_tracking_spec()
+            ])
             
             logger.info("Successfully registered UI abilities")
             
@@ -34,37 +32,41 @@ class UIAbilitiesRegistrar:
             logger.error(f"Error registering UI abilities: {e}")
             raise
             
-    async def _register_window_management(self):
-        """Register window management abilities"""
-        self.ability_awareness.register_ability(
-            ability_name="window_management",
-            handler=self._handle_window_management,
-            description="Manages window state and layout"
-        )
+    def _window_management_spec(self) -> Dict[str, Any]:
+        """Window management ability spec"""
+        return {
+            "name": "Window Management",
+            "ability_type": AbilityType.UI,
+            "description": "Manages window state and layout",
+            "handler": self._handle_window_management
+        }
         
-    async def _register_layout_abilities(self):
-        """Register layout management abilities"""
-        self.ability_awareness.register_ability(
-            ability_name="layout_management", 
-            handler=self._handle_layout_management,
-            description="Controls UI layout and components"
-        )
+    def _layout_adaptation_spec(self) -> Dict[str, Any]:
+        """Layout adaptation ability spec"""
+        return {
+            "name": "Layout Adaptation",
+            "ability_type": AbilityType.UI,
+            "description": "Adapts UI layout based on context",
+            "handler": self._handle_layout_adaptation
+        }
         
-    async def _register_interaction_awareness(self):
-        """Register interaction awareness abilities"""
-        self.ability_awareness.register_ability(
-            ability_name="interaction_awareness",
-            handler=self._handle_interaction_awareness,
-            description="Tracks and responds to user interactions"
-        )
+    def _interaction_context_spec(self) -> Dict[str, Any]:
+        """Interaction context ability spec"""
+        return {
+            "name": "Interaction Context",
+            "ability_type": AbilityType.UI,
+            "description": "Tracks and responds to user interactions",
+            "handler": self._handle_interaction_context
+        }
         
-    async def _register_mouse_tracking(self):
-        """Register mouse tracking abilities"""
-        self.ability_awareness.register_ability(
-            ability_name="mouse_tracking",
-            handler=self._handle_mouse_tracking,
-            description="Tracks mouse movement and interactions"
-        )
+    def _mouse_tracking_spec(self) -> Dict[str, Any]:
+        """Mouse tracking ability spec"""
+        return {
+            "name": "Mouse Tracking",
+            "ability_type": AbilityType.UI,
+            "description": "Tracks mouse position and behavior",
+            "handler": self._handle_mouse_tracking
+        }
         
     async def _handle_window_management(self, context: Dict[str, Any]) -> AbilityStatus:
         """Handle window management operations"""
@@ -75,22 +77,22 @@ class UIAbilitiesRegistrar:
             logger.error(f"Window management error: {e}")
             return AbilityStatus.FAILURE
 
-    async def _handle_layout_management(self, context: Dict[str, Any]) -> AbilityStatus:
-        """Handle layout management operations"""
+    async def _handle_layout_adaptation(self, context: Dict[str, Any]) -> AbilityStatus:
+        """Handle layout adaptation operations"""
         try:
             # Implementation here
             return AbilityStatus.SUCCESS
         except Exception as e:
-            logger.error(f"Layout management error: {e}")
+            logger.error(f"Layout adaptation error: {e}")
             return AbilityStatus.FAILURE
 
-    async def _handle_interaction_awareness(self, context: Dict[str, Any]) -> AbilityStatus:
-        """Handle interaction awareness operations"""
+    async def _handle_interaction_context(self, context: Dict[str, Any]) -> AbilityStatus:
+        """Handle interaction context operations"""
         try:
             # Implementation here
             return AbilityStatus.SUCCESS
         except Exception as e:
-            logger.error(f"Interaction awareness error: {e}")
+            logger.error(f"Interaction context error: {e}")
             return AbilityStatus.FAILURE
 
     async def _handle_mouse_tracking(self, context: Dict[str, Any]) -> AbilityStatus:
@@ -105,23 +107,35 @@ class UIAbilitiesRegistrar:
 class UIAbilityMetrics:
     """Tracks and analyzes UI ability usage and effectiveness"""
     
+    # Per-ability history kept for insights; older samples roll off
+    MAX_CONTEXTS = 512
+    MAX_FEEDBACK = 256
+    
     def __init__(self):
         self.usage_stats: Dict[str, Dict[str, Any]] = {}
         self.effectiveness_metrics: Dict[str, float] = {}
-        self.user_feedback: List[Dict[str, Any]] = []
+        # Ability name -> its most recent feedback entries
+        self._feedback_index: Dict[str, deque] = defaultdict(
+            lambda: deque(maxlen=self.MAX_FEEDBACK)
+        )
         
     def log_ability_usage(self, ability_name: str, context: Dict[str, Any]):
         """Log usage of a UI ability"""
-        if ability_name not in self.usage_stats:
-            self.usage_stats[ability_name] = {
+        stats = self.usage_stats.get(ability_name)
+        if stats is None:
+            # Parallel bounded columns instead of an ever-growing list of dicts
+            stats = self.usage_stats[ability_name] = {
                 "total_uses": 0,
-                "contexts": [],
+                "contexts": deque(maxlen=self.MAX_CONTEXTS),
+                "timestamps": deque(maxlen=self.MAX_CONTEXTS),
                 "last_used": None
             }
             
-        self.usage_stats[ability_name]["total_uses"] += 1
-        self.usage_stats[ability_name]["contexts"].append(context)
-        self.usage_stats[ability_name]["last_used"] = datetime.now()
+        now = time.time()
+        stats["total_uses"] += 1
+        stats["contexts"].append(context)
+        stats["timestamps"].append(now)
+        stats["last_used"] = now
         
     def update_effectiveness(self, ability_name: str, score: float):
         """Update effectiveness score for an ability"""
@@ -129,21 +143,28 @@ class UIAbilityMetrics:
         
     def add_user_feedback(self, ability_name: str, feedback: Dict[str, Any]):
         """Add user feedback for an ability"""
-        self.user_feedback.append({
+        entry = {
             "ability": ability_name,
             "feedback": feedback,
             "timestamp": datetime.now()
-        })
+        }
+        self._feedback_index[ability_name].append(entry)
         
     def get_ability_insights(self, ability_name: str) -> Dict[str, Any]:
         """Get insights about ability usage and effectiveness"""
-        if ability_name not in self.usage_stats:
+        stats = self.usage_stats.get(ability_name)
+        if stats is None:
             return {}
             
         return {
-            "usage": self.usage_stats[ability_name],
+            "usage": {
+                "total_uses": stats["total_uses"],
+                "contexts": list(stats["contexts"]),
+                "timestamps": list(stats["timestamps"]),
+                "last_used": stats["last_used"]
+            },
             "effectiveness": self.effectiveness_metrics.get(ability_name, 0.0),
-            "feedback": [f for f in self.user_feedback if f["ability"] == ability_name]
+            "feedback": list(self._feedback_index.get(ability_name, ()))
         }
 
 class UIAbilitiesRegistrarNew:
@@ -3,15 +3,75 @@ Gemini brain implementation for Octavia.
 """
 
 import os
+import sys
+import time
 from typing import Dict, List, Optional, Union
+from functools import lru_cache
 from loguru import logger
 import asyncio
-import json
 from datetime import datetime
-import mimetypes
+from enum import IntFlag
+import re
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from .modules.model_manager import ModelManager
 from .modules.conversation_manager import ConversationManager
 from .modules.meta_reasoner import MetaReasoner
+from .modules.media_cache import CachedBlob, MediaCache
+
+# Messages of at most three words with no sentence punctuation skip the
+# full-context path in think()
+_SIMPLE_RX = re.compile(r"\A\s*(?:\S+(?:\s+\S+){0,2})?\s*\Z")
+_SIMPLE_PUNCT = frozenset("?!.")
+
+# UI event type -> whether the event warrants a contextual suggestion
+_EVENT_PREDICATES = {
+    'hover': lambda event, suggestion: event.get('hover_duration', 0) > 2.0,
+    'click': lambda event, suggestion: bool(suggestion)
+}
+
+# Common media extensions, resolved without loading the mime tables
+_EXT_TO_MIME = {
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp',
+    '.heic': 'image/heic',
+    '.mp4': 'video/mp4',
+    '.mov': 'video/quicktime',
+    '.webm': 'video/webm',
+    '.avi': 'video/x-msvideo',
+    '.mp3': 'audio/mpeg',
+    '.wav': 'audio/wav',
+    '.ogg': 'audio/ogg',
+    '.flac': 'audio/flac',
+    '.m4a': 'audio/mp4',
+    '.aac': 'audio/aac'
+}
+
+@lru_cache(maxsize=256)
+def _mime_for(ext: str) -> str:
+    """Mime type for a lowercased file extension, or '' if unknown"""
+    if ext in _EXT_TO_MIME:
+        return _EXT_TO_MIME[ext]
+    import mimetypes  # Loaded on first uncommon extension; it reads the system mime tables
+    return mimetypes.guess_type(f"file{ext}")[0] or ""
+
+def _mtime_ns(path: str) -> Optional[int]:
+    """Modification time of a path, or None if it cannot be read"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+class BrainAbility(IntFlag):
+    """Bit positions for the model manager's abilities"""
+    CODE_GENERATION = 1
+    CODE_EXPLANATION = 2
+    CODE_REVIEW = 4
+    DEBUGGING = 8
+    REFACTORING = 16
 
 class GeminiBrain:
     """Brain implementation using Gemini 1.5 Flash"""
@@ -21,33 +81,98 @@ class GeminiBrain:
     MAX_VIDEO_SIZE = 100 * 1024 * 1024  # 100MB
     MAX_AUDIO_SIZE = 50 * 1024 * 1024   # 50MB
     
+    # Mime prefix -> (media_content key, size limit)
+    _MEDIA_KINDS = {
+        'image': ('images', MAX_IMAGE_SIZE),
+        'video': ('video', MAX_VIDEO_SIZE),
+        'audio': ('audio', MAX_AUDIO_SIZE)
+    }
+    
+    # Total size of uploaded files referenced by the media cache
+    MAX_FILE_CACHE_SIZE = 512 * 1024 * 1024  # 512MB
+    
+    # The File API deletes uploads after 48 hours; cached handles are
+    # re-uploaded once within the margin of their expiry
+    FILE_API_RETENTION = 48 * 60 * 60  # seconds
+    FILE_EXPIRY_MARGIN = 60 * 60  # seconds
+    
+    # Directory snapshots kept for spatial context
+    SPATIAL_CACHE_SIZE = 8
+    
+    # Seconds to wait for UI events to settle before acting on the last one
+    INTERACTION_DEBOUNCE = 0.05
+    
+    # Threads for blocking uploads, so several media files upload in parallel
+    THREAD_POOL_SIZE = int(os.getenv("OCTAVIA_THREAD_POOL_SIZE", "32"))
+    
     def __init__(self, api_key: Optional[str] = None):
         """Initialize the brain with Gemini model"""
         self.model_manager = ModelManager(api_key)
         self.conversation_manager = ConversationManager(self)
         self.meta_reasoner = MetaReasoner()
-        self._file_cache = {}
+        self._file_cache = MediaCache(self.MAX_FILE_CACHE_SIZE)
+        self._io_executor = ThreadPoolExecutor(
+            max_workers=self.THREAD_POOL_SIZE,
+            thread_name_prefix="brain-io"
+        )
         self.interaction_context = {}
+        self._pending_interaction = None
+        self._interaction_flush = None
+        
+        # (cwd, file) -> ((cwd mtime, dir mtime), (spatial map, related files))
+        self._spatial_cache = OrderedDict()
+        self._spatial_refreshing = set()
+        
+        # Static system prompt; every prompt starts with these exact bytes
+        self._static_prefix = self.model_manager.get_prompt({})
+        
+        # Environment details that cannot change while the process runs
+        self._env_static = {
+            'platform': os.name,
+            'python_version': sys.version
+        }
         self.is_processing = False
         self._chat = None
+        self._chat_model = None
         self._stop_requested = False
         
-        # Register abilities from model manager
-        self.abilities = {}
+        # Register abilities from model manager as a bitmask
+        self.abilities_mask = BrainAbility(0)
         for ability_name, ability_data in self.model_manager.abilities.items():
-            self.abilities[ability_name] = ability_data["enabled"]
+            ability = BrainAbility.__members__.get(ability_name.upper())
+            if ability is None:
+                logger.warning(f"Unknown ability: {ability_name}")
+            elif ability_data["enabled"]:
+                self.abilities_mask |= ability
             
         # Initialize chat if model is ready
         if self.model_manager.model:
             self._init_chat()
             
+    @property
+    def abilities(self) -> Dict[str, bool]:
+        """Ability name -> enabled, derived from the bitmask"""
+        return {
+            ability.name.lower(): bool(self.abilities_mask & ability)
+            for ability in BrainAbility
+        }
+        
+    def has_ability(self, ability: BrainAbility) -> bool:
+        """Check whether an ability is enabled"""
+        return bool(self.abilities_mask & ability)
+        
     def _init_chat(self):
-        """Initialize chat session"""
+        """Initialize a chat session unless one is open on the current model"""
         try:
-            if not self.model_manager.model:
+            model = self.model_manager.model
+            if not model:
                 logger.error("Model not initialized")
                 return
-            self._chat = self.model_manager.model.start_chat(history=[])
+            # A new model (e.g. after an API key change) needs a new session
+            if self._chat is not None and self._chat_model is model:
+                return
+            self._chat = model.start_chat(history=[])
+            self._chat_model = model
             logger.info("Chat session initialized")
         except Exception as e:
             logger.error(f"Failed to initialize chat: {e}")
@@ -72,61 +197,51 @@ class GeminiBrain:
         try:
             # Handle media files if present
             media_content = {}
+            media_parts = []
             if media_files:
-                media_tasks = []
+                media_types = []
+                media_keys = []
+                media_jobs = []
                 for file in media_files:
-                    file_size = os.path.getsize(file['path'])
-                    file_type = mimetypes.guess_type(file['path'])[0]
-                    
-                    # Check file size limits
-                    if file_type.startswith('image/') and file_size > self.MAX_IMAGE_SIZE:
-                        logger.warning(f"Image too large: {file_size} bytes")
+                    file_type = _mime_for(os.path.splitext(file['path'])[1].lower())
+                    kind = file_type.partition('/')[0]
+                    if kind not in self._MEDIA_KINDS:
                         continue
-                    elif file_type.startswith('video/') and file_size > self.MAX_VIDEO_SIZE:
-                        logger.warning(f"Video too large: {file_size} bytes")
+                    media_type, size_limit = self._MEDIA_KINDS[kind]
+                        
+                    try:
+                        file_stat = os.stat(file['path'])
+                    except OSError as e:
+                        logger.error(f"Error processing {media_type}: {str(e)}")
                         continue
-                    elif file_type.startswith('audio/') and file_size > self.MAX_AUDIO_SIZE:
-                        logger.warning(f"Audio too large: {file_size} bytes")
+                    file_size = file_stat.st_size
+                    
+                    # Check file size limits
+                    if file_size > size_limit:
+                        logger.warning(f"{kind.capitalize()} too large: {file_size} bytes")
                         continue
                     
-                    cache_key = f"{file['path']}_{datetime.now().timestamp()}"
+                    # Path, mtime and size stand in for a content hash: resending
+                    # an unchanged file hits without reading it
+                    cache_key = f"{file['path']}_{file_stat.st_mtime_ns}_{file_size}"
                     
-                    if file_type.startswith('image/'):
-                        task = asyncio.create_task(self._process_image(file, cache_key))
-                        media_tasks.append(('images', task))
-                    elif file_type.startswith('video/'):
-                        task = asyncio.create_task(self._process_video(file, cache_key))
-                        media_tasks.append(('video', task))
-                    elif file_type.startswith('audio/'):
-                        task = asyncio.create_task(self._process_audio(file, cache_key))
-                        media_tasks.append(('audio', task))
+                    media_types.append(media_type)
+                    media_keys.append(cache_key)
+                    media_jobs.append(self._process_media(file['path'], cache_key, file_type, file_size))
                 
                 # Process all media files concurrently
-                for media_type, task in media_tasks:
-                    try:
-                        result = await task
-                        if media_type not in media_content:
-                            media_content[media_type] = []
-                        media_content[media_type].append(result)
-                    except Exception as e:
-                        logger.error(f"Error processing {media_type}: {str(e)}")
+                results = await asyncio.gather(*media_jobs, return_exceptions=True)
+                for media_type, cache_key, result in zip(media_types, media_keys, results):
+                    if isinstance(result, Exception):
+                        logger.error(f"Error processing {media_type}: {str(result)}")
                         continue
+                    media_content.setdefault(media_type, []).append(
+                        {'cache_key': cache_key, 'file_uri': result.file_uri}
+                    )
+                    media_parts.append(result.file)
                         
-            # Get cached context if available
-            cached_context = None
-            if context and 'cache_key' in context:
-                cached_context = self.model_manager.get_cached_context(context['cache_key'])
-                
-            # Prepare model inputs
-            model_context = {
-                'conversation_history': self.conversation_manager._conversation_history,  # Use full history
-                'cached_context': cached_context,
-                'media_content': media_content if media_content else None,
-                'user_context': context if context else {}
-            }
-            
             # Generate response
-            response = await self.generate_response(message)
+            response = await self.generate_response(message, media=media_parts)
             
             # Update conversation history
             self.conversation_manager.add_to_history(
@@ -141,48 +256,32 @@ class GeminiBrain:
             logger.error(f"Error processing input: {str(e)}")
             raise
             
-    async def _process_image(self, file: Dict, cache_key: str) -> Dict:
-        """Process and cache image file"""
-        try:
-            with open(file['path'], 'rb') as f:
-                image_data = f.read()
-            self._file_cache[cache_key] = {
-                'data': image_data,
-                'mime_type': mimetypes.guess_type(file['path'])[0]
-            }
-            return {'cache_key': cache_key}
-        except Exception as e:
-            logger.error(f"Error processing image: {str(e)}")
-            raise
-            
-    async def _process_video(self, file: Dict, cache_key: str) -> Dict:
-        """Process and cache video file"""
-        try:
-            # Use File API for video processing
-            with open(file['path'], 'rb') as f:
-                video_data = f.read()
-            self._file_cache[cache_key] = {
-                'data': video_data,
-                'mime_type': mimetypes.guess_type(file['path'])[0]
-            }
-            return {'cache_key': cache_key}
-        except Exception as e:
-            logger.error(f"Error processing video: {str(e)}")
-            raise
+    async def _process_media(self, path: str, cache_key: str, mime_type: str, size: int) -> CachedBlob:
+        """Upload an image, video or audio file unless already cached"""
+        # Errors propagate to process_input, which logs them per media type
+        entry = self._file_cache.get(cache_key)
+        if entry is not None:
+            if entry.expires_at - self.FILE_EXPIRY_MARGIN > time.time():
+                return entry
+            # The server deletes uploads after a while; upload again
+            self._file_cache.pop(cache_key)
             
-    async def _process_audio(self, file: Dict, cache_key: str) -> Dict:
-        """Process and cache audio file"""
-        try:
-            with open(file['path'], 'rb') as f:
-                audio_data = f.read()
-            self._file_cache[cache_key] = {
-                'data': audio_data,
-                'mime_type': mimetypes.guess_type(file['path'])[0]
-            }
-            return {'cache_key': cache_key}
-        except Exception as e:
-            logger.error(f"Error processing audio: {str(e)}")
-            raise
+        # The File API reads the file from disk, so only its handle is kept.
+        # upload_file returns once the file is ACTIVE and raises otherwise,
+        # so unusable handles are never cached
+        loop = asyncio.get_running_loop()
+        uploaded = await loop.run_in_executor(
+            self._io_executor, self.model_manager.upload_file, path, mime_type
+        )
+        expiration = getattr(uploaded, 'expiration_time', None)
+        expires_at = (
+            expiration.timestamp() if expiration
+            else time.time() + self.FILE_API_RETENTION
+        )
+        entry = CachedBlob(uploaded.uri, mime_type, uploaded, expires_at)
+        if not self._file_cache.put(cache_key, entry, size):
+            logger.warning(f"Media too large to cache: {size} bytes")
+        return entry
 
     async def set_api_key(self, api_key: str) -> bool:
         """Set or update the Gemini API key."""
@@ -221,6 +320,17 @@ class GeminiBrain:
 
     def _enrich_context(self, context: Dict) -> Dict:
         """Enrich context with additional information"""
+        # Nothing to enrich from yet: skip the environment and spatial scans
+        if not context and not getattr(self.conversation_manager, '_conversation_history', None):
+            return {
+                'system': self._static_prefix,
+                'user_context': {},
+                'assistant_context': {},
+                'environment': dict(self._env_static),
+                'spatial_context': {},
+                'dynamic': self._dynamic_context()
+            }
+            
         if not context:
             context = {}
             
@@ -229,7 +339,8 @@ class GeminiBrain:
             'user_context': {},
             'assistant_context': {},
             'environment': {},
-            'spatial_context': {}  # New spatial context
+            'spatial_context': {},  # New spatial context
+            'dynamic': {}  # Per-request values, kept last
         }
         
         # Add user technical level and preferences
@@ -241,28 +352,23 @@ class GeminiBrain:
                 'verbosity': self.conversation_manager._user_style.get('verbosity', 0.5)
             })
         
-        # Add conversation history summary if available
-        if hasattr(self.conversation_manager, '_conversation_history'):
-            history = self.conversation_manager._conversation_history[-10:]  # Last 5 exchanges
-            if history:
-                enriched['assistant_context']['recent_history'] = history
+        # Add the rolling conversation summary and recent turns
+        history = self.conversation_manager.get_memory_context()
+        if history:
+            enriched['assistant_context']['recent_history'] = history
         
-        # Add environmental context
-        enriched['environment'].update({
-            'timestamp': datetime.now().isoformat(),
-            'timezone': datetime.now().astimezone().tzname(),
-            'platform': os.name,
-            'python_version': os.sys.version
-        })
+        # Static environment goes with the prefix; the clock trails it
+        enriched['environment'].update(self._env_static)
+        enriched['dynamic'].update(self._dynamic_context())
         
         # Add spatial awareness context
         try:
             current_location = self.meta_reasoner.check_current_location()
-            spatial_map = self.meta_reasoner.analyze_directory_structure(os.getcwd())
+            spatial_map, related_files = self._spatial_snapshot(current_location)
             enriched['spatial_context'] = {
                 'current_location': current_location,
                 'spatial_map': spatial_map,
-                'related_files': self.meta_reasoner.get_related_files(current_location)
+                'related_files': list(related_files)
             }
         except Exception as e:
             logger.warning(f"Could not enrich spatial context: {e}")
@@ -277,15 +383,80 @@ class GeminiBrain:
         
         return enriched
 
-    async def generate_response(self, message: str) -> str:
-        """Generate a response to the given message"""
+    def _dynamic_context(self) -> Dict:
+        """Values that change on every request"""
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'timezone': time.tzname[time.localtime().tm_isdst > 0]
+        }
+
+    def _spatial_snapshot(self, current_location: Dict):
+        """Directory analysis and related files, rescanned only on change"""
+        cwd = os.getcwd()
+        file_path = current_location.get('file_path') if isinstance(current_location, dict) else None
+        key = (cwd, file_path)
+        stamp = (_mtime_ns(cwd), _mtime_ns(os.path.dirname(file_path)) if file_path else None)
+        
+        cached = self._spatial_cache.get(key)
+        if cached is not None:
+            self._spatial_cache.move_to_end(key)
+            cached_stamp, snapshot = cached
+            # On change, serve the previous scan while a rescan runs off the loop
+            if cached_stamp == stamp or self._refresh_spatial(key, stamp, current_location):
+                return snapshot
+                
+        snapshot = self._scan_spatial(cwd, current_location)
+        self._store_spatial(key, stamp, snapshot)
+        return snapshot
+
+    def _scan_spatial(self, cwd: str, current_location: Dict):
+        """Walk the directory and find files related to the current location"""
+        return (
+            self.meta_reasoner.analyze_directory_structure(cwd),
+            self.meta_reasoner.get_related_files(current_location)
+        )
+
+    def _store_spatial(self, key, stamp, snapshot):
+        """Cache a spatial scan, dropping the least recently used"""
+        self._spatial_cache[key] = (stamp, snapshot)
+        self._spatial_cache.move_to_end(key)
+        if len(self._spatial_cache) > self.SPATIAL_CACHE_SIZE:
+            self._spatial_cache.popitem(last=False)
+
+    def _refresh_spatial(self, key, stamp, current_location: Dict) -> bool:
+        """Rescan in the background; False if there is no running loop"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+            
+        if key not in self._spatial_refreshing:
+            self._spatial_refreshing.add(key)
+            future = loop.run_in_executor(
+                self._io_executor, self._scan_spatial, key[0], current_location
+            )
+            future.add_done_callback(
+                lambda done: self._finish_spatial_refresh(key, stamp, done)
+            )
+        return True
+
+    def _finish_spatial_refresh(self, key, stamp, done):
+        """Store a finished background rescan"""
+        self._spatial_refreshing.discard(key)
+        if done.cancelled():
+            return
+        if done.exception():
+            logger.warning(f"Could not refresh spatial context: {done.exception()}")
+            return
+        self._store_spatial(key, stamp, done.result())
+
+    async def generate_response(self, message: str, media: Optional[List] = None) -> str:
+        """Generate a response to the given message and any uploaded media"""
         self._stop_requested = False
         
         try:
             logger.debug("Starting response generation...")
-            if not self._chat:
-                logger.debug("No chat session found, initializing...")
-                self._init_chat()
+            self._init_chat()
                 
             if not self._chat:
                 logger.error("No chat session available")
@@ -294,7 +465,7 @@ class GeminiBrain:
             # Generate response with streaming
             logger.debug("Starting streaming response...")
             response_chunks = []
-            async for chunk in self.generate_stream(message):
+            async for chunk in self.generate_stream(message, media=media):
                 if self._stop_requested:
                     logger.info("Response generation stopped by user")
                     break
@@ -310,15 +481,13 @@ class GeminiBrain:
             logger.error(f"Error generating response: {str(e)}")
             return f"I apologize, but I encountered an error: {str(e)}"
 
-    async def generate_stream(self, message: str):
+    async def generate_stream(self, message: str, media: Optional[List] = None):
         """Generate a streaming response"""
         self._stop_requested = False
         
         try:
             logger.debug("Starting streaming response generation...")
-            if not self._chat:
-                logger.debug("No chat session found, initializing...")
-                self._init_chat()
+            self._init_chat()
                 
             if not self._chat:
                 logger.error("No chat session available")
@@ -326,7 +495,10 @@ class GeminiBrain:
                 return
                 
             # Generate streaming response
-            async for chunk in self.model_manager.generate_stream(message):
+            history = self.conversation_manager.get_memory_prompt()
+            async for chunk in self.model_manager.generate_stream(
+                message, media=media, history=history
+            ):
                 if self._stop_requested:
                     logger.info("Response generation stopped by user")
                     break
@@ -341,7 +513,7 @@ class GeminiBrain:
         """Process a message with context and history to generate a response"""
         try:
             # For simple messages, use basic prompt
-            if len(message.split()) <= 3 and not any(char in message for char in "?!."):
+            if _SIMPLE_RX.match(message) and _SIMPLE_PUNCT.isdisjoint(message):
                 return await self.generate_response(message)
             
             # For complex messages, use full context and available functions
@@ -373,27 +545,40 @@ class GeminiBrain:
     def request_stop(self):
         """Request to stop the current response generation"""
         logger.info("Stop requested")
+        # The stream loops check this flag; the chat session is kept
         self._stop_requested = True
-        if self._chat:
-            try:
-                self._init_chat()  # Reset chat session
-            except:
-                pass
         
     async def update_interaction_context(self, context: dict):
         """Update brain's understanding of UI interaction context"""
         try:
+            # Pointer motion never leads to a suggestion
+            if context.get('ui_interaction', {}).get('event_type') == 'mouse_move':
+                return
+                
+            # Only the last event in each debounce window is acted on
+            self._pending_interaction = context
+            if self._interaction_flush is None:
+                self._interaction_flush = asyncio.create_task(self._flush_interaction())
+                
+        except Exception as e:
+            logger.error(f"Error updating interaction context: {e}")
+            
+    async def _flush_interaction(self):
+        """Apply the latest UI event once the debounce window closes"""
+        try:
+            await asyncio.sleep(self.INTERACTION_DEBOUNCE)
+            context = self._pending_interaction
+            self._pending_interaction = None
+            self._interaction_flush = None
             self.interaction_context.update(context)
             
             # If we have suggestions and aren't currently processing
-            if (not self.is_processing and 
-                context.get('suggestions') and 
-                context['ui_interaction']['event_type'] != 'mouse_move'):
-                
+            if not self.is_processing and context.get('suggestions'):
                 # Consider making a contextual suggestion
                 await self._consider_contextual_response(context)
                 
         except Exception as e:
+            self._interaction_flush = None
             logger.error(f"Error updating interaction context: {e}")
             
     async def _consider_contextual_response(self, context: dict):
@@ -407,21 +592,22 @@ class GeminiBrain:
             event = context['ui_interaction']
             
             # Check if suggestion is relevant enough
-            if (event['event_type'] == 'hover' and event.get('hover_duration', 0) > 2.0) or \
-               (event['event_type'] == 'click' and suggestion):
-                
-                # Generate subtle contextual response
-                response = await self.generate_response(
-                    "_ui_context_",  # Special trigger for UI context
-                    additional_context={
-                        "ui_event": event,
-                        "suggestion": suggestion
-                    }
-                )
+            predicate = _EVENT_PREDICATES.get(event['event_type'])
+            if predicate is None or not predicate(event, suggestion):
+                return
                 
-                if response:
-                    # UI will handle showing this appropriately
-                    pass
+            # Generate subtle contextual response
+            response = await self.generate_response(
+                "_ui_context_",  # Special trigger for UI context
+                additional_context={
+                    "ui_event": event,
+                    "suggestion": suggestion
+                }
+            )
+            
+            if response:
+                # UI will handle showing this appropriately
+                pass
                     
         except Exception as e:
             logger.error(f"Error considering contextual response: {e}")
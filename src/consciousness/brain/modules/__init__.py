@@ -5,6 +5,7 @@ Brain module components for Octavia
 from .command_processor import CommandProcessor
 from .conversation_manager import ConversationManager
 from .model_manager import ModelManager
+from .media_cache import CachedBlob, MediaCache
 from .prompt_core import PromptManager
 from .prompt_metrics import PromptMetrics, PromptMonitor
 from .prompt_capabilities import CapabilityManager
@@ -13,6 +14,8 @@ __all__ = [
     'CommandProcessor',
     'ConversationManager',
     'ModelManager',
+    'CachedBlob',
+    'MediaCache',
     'PromptManager',
     'PromptMetrics',
     'PromptMonitor',
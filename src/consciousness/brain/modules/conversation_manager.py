@@ -2,14 +2,14 @@
 Conversation management functionality for Octavia's brain.
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from loguru import logger
-import json
 from datetime import datetime
-from collections import defaultdict
+from collections import defaultdict, deque
+import asyncio
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
 from ...context.context_manager import ContextManager
+from .model_manager import stable_dumps
 
 class ConversationSegment:
     """Represents a segment of conversation with its importance score"""
@@ -26,6 +26,8 @@ class ConversationSegment:
         if not self.messages:
             return
             
+        # sklearn pulls in scipy; import it only once scoring is needed
+        from sklearn.feature_extraction.text import TfidfVectorizer
         vectorizer = TfidfVectorizer()
         try:
             tfidf_matrix = vectorizer.fit_transform(self.messages + recent_topics)
@@ -34,6 +36,79 @@ class ConversationSegment:
         except:
             self.importance_score = 0.5
 
+class MemorySummary:
+    """Rolling summary of older turns plus the most recent turns verbatim"""
+    
+    SUMMARY_PROMPT = (
+        "Summarize prior dialogue into dense bullet facts. Keep names, "
+        "decisions, preferences and open tasks; drop pleasantries.\n\n"
+    )
+    
+    def __init__(self, recent_turns: int = 6, token_budget: int = 2000):
+        self.summary = ""
+        self.recent = deque(maxlen=recent_turns)
+        self.pending: List[Tuple[str, str]] = []  # Turns out of recent, not yet summarized
+        self.token_budget = token_budget
+        
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """Rough token count, at about four characters per token"""
+        return len(text) // 4
+        
+    def add_turn(self, message: str, response: str):
+        """Record a turn, moving the oldest recent turn to pending if full"""
+        if len(self.recent) == self.recent.maxlen:
+            self.pending.append(self.recent[0])
+        self.recent.append((message, response))
+        
+    def needs_summary(self) -> bool:
+        """Whether the summary and pending turns exceed the token budget"""
+        pending_text = "".join(m + r for m, r in self.pending)
+        return self.estimate_tokens(self.summary + pending_text) > self.token_budget
+        
+    def summary_prompt(self) -> str:
+        """Prompt asking the model to fold pending turns into the summary"""
+        prompt = self.SUMMARY_PROMPT
+        if self.summary:
+            prompt += f"Existing summary:\n{self.summary}\n\n"
+        return prompt + "Dialogue:\n" + "\n".join(
+            f"User: {m}\nOctavia: {r}" for m, r in self.pending
+        )
+        
+    def apply_summary(self, summary: str, turns: int):
+        """Replace the summary and drop the pending turns it covers"""
+        self.summary = summary.strip()
+        del self.pending[:turns]
+        
+    def compact(self):
+        """Fold pending turns into the summary without the model"""
+        lines = [f"- User: {m[:200]} / Octavia: {r[:200]}" for m, r in self.pending]
+        summary = "\n".join(filter(None, [self.summary] + lines))
+        # Keep the newest facts that fit the budget
+        self.summary = summary[-self.token_budget * 4:]
+        self.pending.clear()
+        
+    def messages(self) -> List[str]:
+        """Summary followed by unsummarized and recent turns, oldest first"""
+        messages = [f"Summary of earlier conversation:\n{self.summary}"] if self.summary else []
+        for message, response in list(self.pending) + list(self.recent):
+            messages.extend([message, response])
+        return messages
+        
+    def render(self) -> str:
+        """Summary and turns as prompt text, oldest first"""
+        parts = [f"Summary of earlier conversation:\n{self.summary}"] if self.summary else []
+        parts.extend(
+            f"User: {m}\nOctavia: {r}" for m, r in list(self.pending) + list(self.recent)
+        )
+        return "\n".join(parts)
+        
+    def clear(self):
+        """Forget the summary and all turns"""
+        self.summary = ""
+        self.recent.clear()
+        self.pending.clear()
+
 class ConversationManager:
     """Manages conversation history and consciousness-driven responses"""
     
@@ -52,11 +127,16 @@ class ConversationManager:
         self._recent_topics = []
         self._topic_importance = defaultdict(float)
         self._media_cache = {}  # Cache for multimedia content
+        self._memory = MemorySummary()
+        self._summary_task: Optional[asyncio.Task] = None
         
     def add_to_history(self, message: str, response: str, media_content: Optional[Dict] = None):
         """Add a message-response pair to conversation history with multimedia support"""
         # Add to immediate history
         self._conversation_history.extend([message, response])
+        self._memory.add_turn(message, response)
+        if self._memory.needs_summary():
+            self._schedule_summary()
         
         # Handle media content if present
         if media_content:
@@ -90,6 +170,40 @@ class ConversationManager:
         if len(self._conversation_history) > self._max_active_length * 0.9:
             self._optimize_memory()
             
+    def get_memory_context(self) -> List[str]:
+        """Rolling summary plus recent turns, for the model's context"""
+        return self._memory.messages()
+        
+    def get_memory_prompt(self) -> str:
+        """Rolling summary plus recent turns as text sent ahead of each message"""
+        return self._memory.render()
+        
+    def _schedule_summary(self):
+        """Summarize pending turns in the background, or compact them inline"""
+        if self._summary_task and not self._summary_task.done():
+            return
+            
+        model_manager = getattr(self._consciousness, 'model_manager', None)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is None or model_manager is None:
+            self._memory.compact()
+            return
+            
+        self._summary_task = loop.create_task(self._summarize(model_manager))
+        
+    async def _summarize(self, model_manager):
+        """Replace pending turns with a model-written summary"""
+        turns = len(self._memory.pending)
+        try:
+            summary = await model_manager.generate_text(self._memory.summary_prompt())
+            self._memory.apply_summary(summary, turns)
+        except Exception as e:
+            logger.error(f"Error summarizing conversation: {e}")
+            self._memory.compact()
+            
     def _optimize_memory(self):
         """Optimize memory while maintaining context integrity"""
         # Sort segments by importance and recency
@@ -125,6 +239,7 @@ class ConversationManager:
     def _extract_topics(self, text: str) -> List[str]:
         """Extract key topics from text using TF-IDF"""
         try:
+            from sklearn.feature_extraction.text import TfidfVectorizer
             vectorizer = TfidfVectorizer(
                 max_features=10,
                 stop_words='english',
@@ -183,6 +298,10 @@ class ConversationManager:
         """Clear the conversation history"""
         self._conversation_history = []
         self._conversation_segments = []
+        self._memory.clear()
+        if self._summary_task:
+            self._summary_task.cancel()
+            self._summary_task = None
         self._recent_topics = []
         self._topic_importance = defaultdict(float)
         self._context_manager.clear_conversation_summaries()
@@ -206,15 +325,16 @@ class ConversationManager:
             system_state = context.get('system_state', {})
             user_prefs = context.get('user_preferences', {})
             
-            context_str = "Current Context:\n"
+            parts = ["Current Context:"]
             
             if system_state:
-                context_str += f"System State: {system_state}\n"
+                parts.append(f"System State: {stable_dumps(system_state)}")
             
             if user_prefs:
-                context_str += f"User Preferences: {user_prefs}\n"
+                parts.append(f"User Preferences: {stable_dumps(user_prefs)}")
             
-            return context_str
+            parts.append("")
+            return "\n".join(parts)
         except Exception as e:
             logger.error(f"Error formatting context: {e}")
             return ""
@@ -225,18 +345,19 @@ class ConversationManager:
             if not history:
                 return ""
             
-            history_str = "Recent Conversation:\n"
+            parts = ["Recent Conversation:"]
             
             for entry in history:
                 user_msg = entry.get('user', '')
                 assistant_msg = entry.get('assistant', '')
                 
                 if user_msg:
-                    history_str += f"User: {user_msg}\n"
+                    parts.append(f"User: {user_msg}")
                 if assistant_msg:
-                    history_str += f"Octavia: {assistant_msg}\n"
+                    parts.append(f"Octavia: {assistant_msg}")
             
-            return history_str
+            parts.append("")
+            return "\n".join(parts)
         except Exception as e:
             logger.error(f"Error formatting history: {e}")
             return ""
@@ -0,0 +1,70 @@
+"""
+Byte-bounded media cache for Octavia's brain.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+@dataclass(slots=True)
+class CachedBlob:
+    """A cached media file: its uploaded File API handle and mime type"""
+    file_uri: str
+    mime_type: str
+    file: Any = None
+    expires_at: Optional[float] = None  # Unix time the server deletes the file
+
+    def __getitem__(self, key: str) -> Any:
+        """Dict-style access for readers still using entry['file_uri']"""
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+class MediaCache:
+    """LRU cache of media file entries, bounded by their total size in bytes"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get an entry and mark it most recently used"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: Any, size: int) -> bool:
+        """Store an entry, evicting the least recently used to make room"""
+        if size > self.max_bytes:
+            return False
+
+        self.pop(key)
+        while self._entries and self.current_bytes + size > self.max_bytes:
+            oldest, _ = self._entries.popitem(last=False)
+            self.current_bytes -= self._sizes.pop(oldest)
+
+        self._entries[key] = entry
+        self._sizes[key] = size
+        self.current_bytes += size
+        return True
+
+    def pop(self, key: str):
+        """Remove an entry if present"""
+        if self._entries.pop(key, None) is not None:
+            self.current_bytes -= self._sizes.pop(key)
+
+    def clear(self):
+        """Remove all entries"""
+        self._entries.clear()
+        self._sizes.clear()
+        self.current_bytes = 0
@@ -3,15 +3,23 @@ Model management functionality for Octavia's brain.
 """
 
 import os
+import time
 from typing import Dict, List, Optional, Union, Callable
 from loguru import logger
-import asyncio
-import google.generativeai as genai
-from google.generativeai.types import HarmCategory, HarmBlockThreshold
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
-import json
 import traceback
+import orjson
+
+def stable_dumps(value) -> str:
+    """Render a prompt value with sorted keys so equal values give equal text"""
+    if isinstance(value, str):
+        return value
+    return orjson.dumps(
+        value,
+        default=str,
+        option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+    ).decode()
 
 class ModelManager:
     """Manages the Gemini model configuration and initialization"""
@@ -19,44 +27,12 @@ class ModelManager:
     # Maximum cache size (100MB)
     MAX_CACHE_SIZE = 100 * 1024 * 1024
     
-    def __init__(self, api_key: Optional[str] = None):
-        """Initialize the model manager"""
-        self.api_key = api_key
-        self.model = None
-        self.generation_config = {
-            'temperature': 0.7,
-            'top_p': 0.8,
-            'top_k': 40,
-            'max_output_tokens': 2048,
-        }
-        self.safety_settings = {
-            'HARASSMENT': 'block_none',
-            'HATE_SPEECH': 'block_none',
-            'SEXUALLY_EXPLICIT': 'block_none',
-            'DANGEROUS_CONTENT': 'block_none'
-        }
-        
-        # Register available abilities
-        self.abilities = {
-            'code_generation': {'enabled': True},
-            'code_explanation': {'enabled': True},
-            'code_review': {'enabled': True},
-            'debugging': {'enabled': True},
-            'refactoring': {'enabled': True}
-        }
-        
-        # Initialize if API key provided
-        if api_key:
-            self.initialize_model_sync()
-            
-    def register_ability(self, name: str, handler: Callable):
-        """Register a new ability handler"""
-        if name in self.abilities:
-            self.abilities[name]["register_ability"] = handler
-            
-    def get_prompt(self, context: Optional[dict] = None) -> str:
-        """Get the system prompt with optional context"""
-        base_prompt = """# Octavia Developer Assistant
+    # Polling for uploaded files that the File API is still processing
+    FILE_POLL_INTERVAL = 2.0  # seconds
+    FILE_PROCESSING_TIMEOUT = 300.0  # seconds
+    
+    # Static system prompt; context is only ever appended after it
+    SYSTEM_PROMPT = """# Octavia Developer Assistant
 
 You are a highly skilled, developer-focused AI assistant designed to help users analyze, debug, and improve their codebase in real-time.
 
@@ -134,15 +110,57 @@ For complex tasks (coding, debugging):
    - Track ongoing issues
    - Maintain conversation state
    - Reference previous interactions"""
-
+    
+    def __init__(self, api_key: Optional[str] = None):
+        """Initialize the model manager"""
+        self.api_key = api_key
+        self.model = None
+        self.generation_config = {
+            'temperature': 0.7,
+            'top_p': 0.8,
+            'top_k': 40,
+            'max_output_tokens': 2048,
+        }
+        self.safety_settings = {
+            'HARASSMENT': 'block_none',
+            'HATE_SPEECH': 'block_none',
+            'SEXUALLY_EXPLICIT': 'block_none',
+            'DANGEROUS_CONTENT': 'block_none'
+        }
+        
+        # Register available abilities
+        self.abilities = {
+            'code_generation': {'enabled': True},
+            'code_explanation': {'enabled': True},
+            'code_review': {'enabled': True},
+            'debugging': {'enabled': True},
+            'refactoring': {'enabled': True}
+        }
+        
+        # Initialize if API key provided
+        if api_key:
+            self.initialize_model_sync()
+            
+    def register_ability(self, name: str, handler: Callable):
+        """Register a new ability handler"""
+        if name in self.abilities:
+            self.abilities[name]["register_ability"] = handler
+            
+    def get_prompt(self, context: Optional[dict] = None) -> str:
+        """Get the system prompt with optional context"""
+        # The static prompt always comes first and context is rendered in a
+        # fixed order, so repeat requests share a byte-identical prefix
         if context:
-            context_str = "\n\n## Current Context 📍\n"
-            for key, value in context.items():
-                if key != "abilities":  # Skip abilities in prompt
-                    context_str += f"- {key}: {value}\n"
-            return base_prompt + context_str
+            parts = [self.SYSTEM_PROMPT, "", "## Current Context 📍"]
+            parts.extend(
+                f"- {key}: {stable_dumps(context[key])}"
+                for key in sorted(context, key=str)
+                if key != "abilities"  # Skip abilities in prompt
+            )
+            parts.append("")
+            return "\n".join(parts)
             
-        return base_prompt
+        return self.SYSTEM_PROMPT
 
     async def validate_api_key(self, api_key: str) -> bool:
         """Validate the API key"""
@@ -160,6 +178,11 @@ For complex tasks (coding, debugging):
             if not self.api_key:
                 raise ValueError("API key not set")
                 
+            # The SDK takes most of a second to import, so load it only
+            # when a model is actually configured
+            import google.generativeai as genai
+            from google.generativeai.types import HarmCategory, HarmBlockThreshold
+            
             logger.debug("Configuring Gemini with API key...")
             # Configure Gemini with API key
             genai.configure(api_key=self.api_key)
@@ -180,10 +203,7 @@ For complex tasks (coding, debugging):
             
             logger.debug("Testing connection...")
             # Test connection with simple query
-            response = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: self.model.generate_content("Hi", generation_config={"temperature": 0})
-            )
+            response = await self.model.generate_content_async("Hi", generation_config={"temperature": 0})
             
             logger.debug(f"Test response: {response}")
             
@@ -208,21 +228,15 @@ For complex tasks (coding, debugging):
                 self._chat = self.model.start_chat(history=[])
                 # Send system prompt once
                 system_prompt = self.get_prompt(context)
-                await asyncio.get_event_loop().run_in_executor(
-                    None,
-                    lambda: self._chat.send_message(system_prompt)
-                )
+                await self._chat.send_message_async(system_prompt)
             
             # Generate response asynchronously
             if functions:
                 tools = [{"function_declarations": functions}]
-                response = await asyncio.get_event_loop().run_in_executor(
-                    None,
-                    lambda: self.model.generate_content(
-                        message,
-                        generation_config={"temperature": 0.7},
-                        tools=tools
-                    )
+                response = await self.model.generate_content_async(
+                    message,
+                    generation_config={"temperature": 0.7},
+                    tools=tools
                 )
                 
                 # Check for function call
@@ -238,35 +252,73 @@ For complex tasks (coding, debugging):
                 return response.text
                 
             # Regular chat response
-            response = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: self._chat.send_message(message)
-            )
+            response = await self._chat.send_message_async(message)
             return response.text
             
         except Exception as e:
             logger.error(f"Error generating response: {e}")
             raise
 
-    async def generate_stream(self, message: str) -> str:
+    async def generate_text(self, prompt: str) -> str:
+        """Generate a one-off completion outside the chat session"""
+        try:
+            if not self.model:
+                raise ValueError("Model not initialized")
+                
+            response = await self.model.generate_content_async(
+                prompt,
+                generation_config=self.generation_config
+            )
+            return response.text
+            
+        except Exception as e:
+            logger.error(f"Error generating text: {e}")
+            raise
+
+    def upload_file(self, path: str, mime_type: str):
+        """Upload a media file to the Gemini File API and wait until it is ACTIVE
+        
+        Blocks while the file is processing, so call it off the event loop.
+        """
+        import google.generativeai as genai
+        uploaded = genai.upload_file(path=path, mime_type=mime_type)
+        
+        # Video and large audio start out PROCESSING and cannot be used yet
+        deadline = time.monotonic() + self.FILE_PROCESSING_TIMEOUT
+        while uploaded.state.name == "PROCESSING":
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"File {uploaded.name} is still processing")
+            time.sleep(self.FILE_POLL_INTERVAL)
+            uploaded = genai.get_file(uploaded.name)
+            
+        if uploaded.state.name != "ACTIVE":
+            raise ValueError(f"File {uploaded.name} upload {uploaded.state.name.lower()}")
+        return uploaded
+
+    async def generate_stream(self, message: str, media: Optional[List] = None,
+                              history: Optional[str] = None) -> str:
         """Generate a streaming response from the model"""
         try:
             if not self.model:
                 raise ValueError("Model not initialized")
                 
-            # Create streaming response
-            response = self.model.generate_content(
-                message,
+            # Each request is standalone, so the conversation memory leads
+            # the message; uploaded files go ahead of the text
+            if history:
+                message = f"{history}\n\nUser: {message}"
+                
+            # The async client keeps the loop free while chunks arrive
+            response = await self.model.generate_content_async(
+                [*media, message] if media else message,
                 stream=True,
                 generation_config=self.generation_config
             )
             
             # Stream response chunks
-            for chunk in response:
+            async for chunk in response:
                 if not chunk.text:
                     continue
                 yield chunk.text
-                await asyncio.sleep(0)  # Allow other tasks to run
                 
         except Exception as e:
             logger.error(f"Error in generate_stream: {e}")
@@ -275,6 +327,7 @@ For complex tasks (coding, debugging):
     def initialize_model_sync(self):
         """Initialize model synchronously"""
         try:
+            import google.generativeai as genai
             genai.configure(api_key=self.api_key)
             self.model = genai.GenerativeModel('gemini-1.5-pro')
             self._api_key = self.api_key
@@ -289,6 +342,9 @@ For complex tasks (coding, debugging):
             if not api_key:
                 raise ValueError("API key is required")
                 
+            import google.generativeai as genai
+            from google.generativeai.types import HarmCategory, HarmBlockThreshold
+            
             self._api_key = api_key
             genai.configure(api_key=api_key)
             
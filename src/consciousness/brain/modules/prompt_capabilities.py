@@ -3,19 +3,23 @@ Capability management for Octavia's prompt system
 """
 
 from typing import Dict, List, Set
+from functools import lru_cache
 from loguru import logger
-from google.generativeai.types import HarmCategory, HarmBlockThreshold
 
 class CapabilityManager:
     """Manages prompt capabilities and safety settings"""
     
-    # Safety settings
-    SAFETY_SETTINGS = {
-        HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-        HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-        HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-        HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-    }
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def safety_settings() -> Dict:
+        """Safety settings, built on first use so the Gemini SDK loads lazily"""
+        from google.generativeai.types import HarmCategory, HarmBlockThreshold
+        return {
+            HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+            HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+            HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+            HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+        }
     
     def __init__(self):
         """Initialize capability manager with core and extended capabilities"""
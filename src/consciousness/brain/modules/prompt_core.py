@@ -4,11 +4,12 @@ Core prompt management functionality for Octavia
 
 from typing import Dict, Any
 from loguru import logger
-import json
+import orjson
 import time
 from datetime import datetime, timedelta
 from .prompt_metrics import PromptMetrics, PromptMonitor
 from .prompt_capabilities import CapabilityManager
+from .model_manager import stable_dumps
 
 class PromptManager:
     """Core prompt management with Gemini 1.5 optimization"""
@@ -94,10 +95,10 @@ Response: I notice you're browsing files. Would you like to:
         try:
             # Sort context items for consistent key generation
             sorted_items = sorted(
-                (str(k), str(v)) for k, v in context.items()
+                (str(k), stable_dumps(v)) for k, v in context.items()
                 if not k.startswith('_')  # Skip internal keys
             )
-            return json.dumps(sorted_items)
+            return orjson.dumps(sorted_items).decode()
         except Exception as e:
             logger.error(f"Error generating cache key: {e}")
             return str(time.time())  # Fallback to timestamp
@@ -2,15 +2,26 @@
 Octavia's Context Management System
 """
 
-import json
 import sqlite3
+import orjson
 from typing import Dict, List, Optional
 from datetime import datetime
 from pathlib import Path
 from loguru import logger
-from sklearn.feature_extraction.text import TfidfVectorizer
 import numpy as np
 
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def _to_builtin(obj):
+    """Fallback for values orjson cannot encode natively, e.g. numpy scalars"""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def _dumps(obj) -> str:
+    """Serialize to JSON text; numpy arrays are encoded without tolist()"""
+    return orjson.dumps(obj, default=_to_builtin, option=_ORJSON_OPTIONS).decode()
+
 class ContextManager:
     """Manages Octavia's understanding of context and state"""
     
@@ -112,10 +123,10 @@ class ContextManager:
                     """, (
                         summary['timestamp'],
                         summary['importance'],
-                        json.dumps(summary['topics']),
-                        json.dumps(summary['key_points']),
-                        json.dumps(summary['messages']),
-                        json.dumps(embedding.tolist() if embedding is not None else [])
+                        _dumps(summary['topics']),
+                        _dumps(summary['key_points']),
+                        _dumps(summary['messages']),
+                        _dumps(embedding if embedding is not None else [])
                     ))
                     
                     # Update topic relationships
@@ -144,7 +155,7 @@ class ContextManager:
                 # Calculate relevance scores
                 scored_summaries = []
                 for summary in summaries:
-                    embedding = np.array(json.loads(summary[6]))  # embedding column
+                    embedding = np.array(orjson.loads(summary[6]))  # embedding column
                     if len(embedding) > 0:
                         similarity = np.dot(current_embedding, embedding) / (
                             np.linalg.norm(current_embedding) * np.linalg.norm(embedding)
@@ -157,9 +168,9 @@ class ContextManager:
                     {
                         'timestamp': s[1],
                         'importance': s[2],
-                        'topics': json.loads(s[3]),
-                        'key_points': json.loads(s[4]),
-                        'messages': json.loads(s[5])
+                        'topics': orjson.loads(s[3]),
+                        'key_points': orjson.loads(s[4]),
+                        'messages': orjson.loads(s[5])
                     }
                     for s, _ in scored_summaries[:limit]
                 ]
@@ -171,6 +182,8 @@ class ContextManager:
     def _create_embedding(self, text: str) -> Optional[np.ndarray]:
         """Create a vector embedding for text"""
         try:
+            # Deferred: sklearn (and scipy behind it) is slow to import
+            from sklearn.feature_extraction.text import TfidfVectorizer
             vectorizer = TfidfVectorizer(max_features=100)
             tfidf_matrix = vectorizer.fit_transform([text])
             return tfidf_matrix.toarray()[0]
@@ -224,8 +237,8 @@ class ContextManager:
                 preferences = cursor.fetchone()
                 
                 return {
-                    'system_state': json.loads(system_state[0]) if system_state else {},
-                    'user_preferences': json.loads(preferences[0]) if preferences else {}
+                    'system_state': orjson.loads(system_state[0]) if system_state else {},
+                    'user_preferences': orjson.loads(preferences[0]) if preferences else {}
                 }
         except Exception as e:
             logger.error(f"Error getting current context: {e}")
@@ -239,7 +252,7 @@ class ContextManager:
                 cursor.execute("""
                     INSERT INTO system_state (timestamp, state_data)
                     VALUES (?, ?)
-                """, (datetime.now().isoformat(), json.dumps(state)))
+                """, (datetime.now().isoformat(), _dumps(state)))
                 conn.commit()
                 logger.info("Successfully updated system state")
         except Exception as e:
@@ -254,7 +267,7 @@ class ContextManager:
                 cursor.execute("""
                     INSERT INTO user_preferences (timestamp, preferences)
                     VALUES (?, ?)
-                """, (datetime.now().isoformat(), json.dumps(preferences)))
+                """, (datetime.now().isoformat(), _dumps(preferences)))
                 conn.commit()
                 logger.info("Successfully updated user preferences")
         except Exception as e:
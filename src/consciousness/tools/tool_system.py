@@ -56,6 +56,13 @@ class ToolSystem:
                 self.consciousness = Consciousness()
                 await self.consciousness.initialize()
         
+    async def shutdown(self):
+        """Shut down the consciousness system if it was started"""
+        with self._lock:
+            consciousness, self.consciousness = self.consciousness, None
+        if consciousness:
+            await consciousness.aclose()
+            
     def register_tool(self, name: str, func: Callable, category: ToolCategory,
                      parameters: List[ToolParameter], description: str):
         """Register a new tool"""
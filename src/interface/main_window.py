@@ -29,6 +29,7 @@ from consciousness.brain.gemini_brain import GeminiBrain
 from interface.awareness.ui_observer import UIObserver
 from interface.awareness.ui_awareness import UIAwarenessSystem
 from consciousness.awareness.ui_abilities import UIAbilitiesRegistrarNew as UIAbilitiesRegistrar
+from consciousness.tools.tool_system import ToolSystem
 
 class OctaviaState:
     """State management for Octavia"""
@@ -102,6 +103,14 @@ class MainWindow(QMainWindow):
             logger.error(f"Error during async initialization: {str(e)}")
             raise
 
+    async def shutdown(self):
+        """Flush and release background systems before exit"""
+        logger.info("Shutting down...")
+        try:
+            await ToolSystem().shutdown()
+        except Exception as e:
+            logger.error(f"Error during shutdown: {str(e)}")
+
     def _initialize_ui_observer(self):
         """Initialize UI observer"""
         try:
@@ -7,47 +7,51 @@ import sys
 import os
 from pathlib import Path
 import asyncio
-import qasync
 import traceback
 import platform
 import psutil
 import signal
-from PySide6.QtWidgets import QApplication
-from PySide6.QtCore import Qt, QOperatingSystemVersion
-from PySide6.QtGui import QIcon
 from loguru import logger
 import time
 
-# Configure comprehensive logging
-log_dir = Path(__file__).parent.parent / "logs"
-log_dir.mkdir(exist_ok=True)
-log_path = log_dir / "octavia.log"
+# Set once logging sinks are installed; repeated configuration would stack
+# duplicate handlers and format every record several times
+_LOGGING_CONFIGURED = False
 
-# Remove default logger and set up our custom configuration
-logger.remove()
-logger.add(
-    log_path,
-    format="<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
-    level="DEBUG",
-    rotation="1 day",
-    retention="7 days",
-    backtrace=True,
-    diagnose=True,
-    enqueue=True,
-    catch=True,
-)
-# Also log to stderr for immediate feedback
-logger.add(
-    sys.stderr,
-    format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <level>{message}</level>",
-    level="INFO",
-    backtrace=True,
-    diagnose=True,
-)
+def configure_logging():
+    """Configure comprehensive logging (only the first call has any effect)"""
+    global _LOGGING_CONFIGURED
+    if _LOGGING_CONFIGURED:
+        return
+        
+    log_dir = Path(__file__).parent.parent / "logs"
+    log_dir.mkdir(exist_ok=True)
+    log_path = log_dir / "octavia.log"
+    
+    # Remove default logger and set up our custom configuration
+    logger.remove()
+    logger.add(
+        log_path,
+        format="<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
+        level="DEBUG",
+        rotation="1 day",
+        retention="7 days",
+        backtrace=True,
+        diagnose=True,
+        enqueue=True,
+        catch=True,
+    )
+    # Also log to stderr for immediate feedback
+    logger.add(
+        sys.stderr,
+        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <level>{message}</level>",
+        level="INFO",
+        backtrace=True,
+        diagnose=True,
+    )
+    _LOGGING_CONFIGURED = True
 
-# Add src to Python path
-src_dir = Path(__file__).parent
-sys.path.insert(0, str(src_dir))
+configure_logging()
 
 def cleanup_existing_instances():
     """Clean up any existing Octavia instances"""
@@ -92,6 +96,10 @@ def configure_macos_app():
     if platform.system() == "Darwin":
         logger.info("Configuring macOS specific settings...")
         try:
+            from PySide6.QtWidgets import QApplication
+            from PySide6.QtCore import QOperatingSystemVersion
+            from PySide6.QtGui import QIcon
+            
             # Set macOS app attributes
             QApplication.setApplicationName("Octavia")
             QApplication.setApplicationDisplayName("Octavia AI Assistant")
@@ -125,6 +133,10 @@ async def main():
         # Set up exception handling
         sys.excepthook = exception_handler
         
+        # Qt is imported here so error paths never pay its import cost
+        import qasync
+        from PySide6.QtWidgets import QApplication
+        
         # Create Qt application instance
         app = QApplication.instance()
         if app is None:
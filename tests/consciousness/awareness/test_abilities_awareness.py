@@ -7,6 +7,7 @@ import asyncio
 from pathlib import Path
 import tempfile
 import json
+import sqlite3
 from datetime import datetime, timedelta
 
 from src.consciousness.awareness.abilities_awareness import (
@@ -54,9 +55,27 @@ async def test_register_ability(ability_awareness):
     
     assert ability_id.startswith("ability_")
     assert ability_id in ability_awareness._active_abilities
-    assert ability_awareness._active_abilities[ability_id]["name"] == name
-    assert ability_awareness._active_abilities[ability_id]["type"] == ability_type
-    assert ability_awareness._active_abilities[ability_id]["status"] == AbilityStatus.ACTIVE
+    assert ability_awareness._active_abilities[ability_id].name == name
+    assert ability_awareness._active_abilities[ability_id].type == ability_type
+    assert ability_awareness._active_abilities[ability_id].status == AbilityStatus.ACTIVE
+
+@pytest.mark.asyncio
+async def test_register_abilities_bulk(ability_awareness):
+    """Test registering several abilities in one transaction"""
+    ability_ids = await ability_awareness.register_abilities_bulk([
+        {
+            "name": f"Bulk Ability {i}",
+            "description": f"Bulk ability {i}",
+            "ability_type": AbilityType.ACTION
+        }
+        for i in range(3)
+    ])
+    
+    assert len(ability_ids) == 3
+    assert len(set(ability_ids)) == 3
+    for i, ability_id in enumerate(ability_ids):
+        assert ability_awareness._active_abilities[ability_id].name == f"Bulk Ability {i}"
+        assert ability_id in ability_awareness._ability_metrics
 
 @pytest.mark.asyncio
 async def test_ability_metrics(ability_awareness):
@@ -102,7 +121,7 @@ async def test_ability_status_updates(ability_awareness):
         reason="maintenance"
     )
     
-    assert ability_awareness._active_abilities[ability_id]["status"] == AbilityStatus.INACTIVE
+    assert ability_awareness._active_abilities[ability_id].status == AbilityStatus.INACTIVE
 
 @pytest.mark.asyncio
 async def test_find_relevant_abilities(ability_awareness):
@@ -200,6 +219,98 @@ async def test_ability_suggestions(ability_awareness):
     # Higher success rate abilities should be suggested first
     assert suggestions[0]["id"] == ability_ids[2]  # Highest success rate
 
+@pytest.mark.asyncio
+async def test_metrics_batching(ability_awareness):
+    """Test buffered metrics are written on flush"""
+    ability_id = await ability_awareness.register_ability(
+        name="Batch Test",
+        description="Testing metric batching",
+        ability_type=AbilityType.ACTION
+    )
+    
+    for _ in range(3):
+        await ability_awareness.record_ability_use(
+            ability_id,
+            success=True,
+            response_time=0.5
+        )
+    
+    await ability_awareness.aclose()
+    
+    with sqlite3.connect(ability_awareness.db_path) as conn:
+        usage_count, success_count = conn.execute(
+            "SELECT usage_count, success_count FROM ability_metrics_current WHERE ability_id = ?",
+            (ability_id,)
+        ).fetchone()
+    
+    assert usage_count == 3
+    assert success_count == 3
+
+@pytest.mark.asyncio
+async def test_idle_metrics_flushed_by_timer(ability_awareness):
+    """Test buffered metrics are written after the flush interval without another call"""
+    ability_awareness.METRICS_FLUSH_INTERVAL = 0.01
+    ability_id = await ability_awareness.register_ability(
+        name="Timer Test",
+        description="Testing the flush timer",
+        ability_type=AbilityType.ACTION
+    )
+    await ability_awareness.record_ability_use(ability_id, success=True, response_time=0.5)
+    await asyncio.sleep(0.1)
+    
+    with sqlite3.connect(ability_awareness.db_path) as conn:
+        row = conn.execute(
+            "SELECT usage_count FROM ability_metrics_current WHERE ability_id = ?",
+            (ability_id,)
+        ).fetchone()
+    
+    assert row == (1,)
+    assert ability_awareness._flush_task is None
+    ability_awareness.close()
+
+@pytest.mark.asyncio
+async def test_metrics_restored_on_load(abilities_db):
+    """Test current metrics survive reopening the database"""
+    awareness = AbilityAwareness(abilities_db)
+    ability_id = await awareness.register_ability(
+        name="Reload Test",
+        description="Testing metric persistence",
+        ability_type=AbilityType.ACTION
+    )
+    await awareness.record_ability_use(ability_id, success=True, response_time=0.5)
+    await awareness.record_ability_use(ability_id, success=False, response_time=1.5)
+    await awareness.aclose()
+    
+    reopened = AbilityAwareness(abilities_db)
+    metrics = await reopened.get_ability_metrics(ability_id)
+    
+    assert metrics is not None
+    assert metrics.usage_count == 2
+    assert metrics.success_rate == 0.5
+    assert metrics.avg_response_time == 1.0
+    assert reopened._active_abilities[ability_id].name == "Reload Test"
+    reopened.close()
+
+@pytest.mark.asyncio
+async def test_metrics_snapshot_written_on_close(abilities_db):
+    """Test closing without an explicit flush still persists current counters"""
+    awareness = AbilityAwareness(abilities_db)
+    ability_id = await awareness.register_ability(
+        name="Close Test",
+        description="Testing the close path",
+        ability_type=AbilityType.ACTION
+    )
+    for _ in range(4):
+        await awareness.record_ability_use(ability_id, success=True, response_time=0.5)
+    awareness.close()
+    
+    reopened = AbilityAwareness(abilities_db)
+    metrics = await reopened.get_ability_metrics(ability_id)
+    
+    assert metrics.usage_count == 4
+    assert metrics.success_rate == 1.0
+    reopened.close()
+
 def test_ability_relevance_calculation(ability_awareness):
     """Test ability relevance calculation"""
     current_context = {
@@ -72,6 +72,34 @@ async def test_task_dependencies(task_awareness):
     assert chain[0]["id"] == child_id
     assert chain[1]["id"] == parent_id
 
+@pytest.mark.asyncio
+async def test_task_chain_shared_dependencies(task_awareness):
+    """Test tasks reached along several paths appear once, in depth-first order"""
+    base_id = await task_awareness.create_task(title="Base", description="")
+    tip_id = base_id
+    layers = []
+    for i in range(20):
+        left_id = await task_awareness.create_task(
+            title=f"Left {i}", description="", depends_on=[tip_id]
+        )
+        right_id = await task_awareness.create_task(
+            title=f"Right {i}", description="", depends_on=[tip_id]
+        )
+        tip_id = await task_awareness.create_task(
+            title=f"Join {i}", description="", depends_on=[left_id, right_id]
+        )
+        layers.append((left_id, right_id, tip_id))
+    
+    chain = await task_awareness.get_task_chain(tip_id)
+    ids = [task["id"] for task in chain]
+    
+    assert len(ids) == len(set(ids)) == 1 + 3 * len(layers)
+    
+    # Within the top diamond the left branch is walked before the right one
+    left_id, right_id, _ = layers[-1]
+    assert ids[:2] == [tip_id, left_id]
+    assert ids[-1] == right_id
+
 @pytest.mark.asyncio
 async def test_update_task_status(task_awareness):
     """Test updating task status"""
@@ -87,7 +115,9 @@ async def test_update_task_status(task_awareness):
         metadata
     )
     
-    assert task_awareness._active_tasks[task_id]["status"] == TaskStatus.COMPLETED
+    assert task_id not in task_awareness._active_tasks
+    chain = await task_awareness.get_task_chain(task_id)
+    assert chain[0]["status"] == TaskStatus.COMPLETED.value
 
 @pytest.mark.asyncio
 async def test_related_tasks(task_awareness):
@@ -128,6 +158,31 @@ async def test_related_tasks(task_awareness):
     assert len(related) > 0
     assert all(task["relevance"] > 0.5 for task in related)
 
+@pytest.mark.asyncio
+async def test_related_tasks_cache_invalidation(task_awareness):
+    """Test cached related tasks drop a task once it completes"""
+    context = {"domain": "caching"}
+    task_id = await task_awareness.create_task(
+        title="Cached Task",
+        description="Task found through the cache",
+        context=context
+    )
+    
+    first = await task_awareness.get_related_tasks(context)
+    assert [task["id"] for task in first] == [task_id]
+    assert await task_awareness.get_related_tasks(context) == first
+    
+    await task_awareness.update_task_status(task_id, TaskStatus.COMPLETED)
+    assert await task_awareness.get_related_tasks(context) == []
+
+@pytest.mark.asyncio
+async def test_related_tasks_lookup_keeps_versions(task_awareness):
+    """Test querying unseen context types does not add version entries"""
+    for i in range(5):
+        await task_awareness.get_related_tasks({f"unseen_{i}": "value"})
+    
+    assert not task_awareness._ctx_version
+
 @pytest.mark.asyncio
 async def test_context_relevance(task_awareness):
     """Test context relevance calculation"""
@@ -156,16 +211,19 @@ async def test_context_relevance(task_awareness):
     relevance = task_awareness._calculate_context_relevance(list1, list2)
     assert relevance == 0.5  # 2 common elements out of 4 total unique elements
 
-def test_parse_context(task_awareness):
-    """Test context string parsing"""
-    context_str = "type1:{\"key\":\"value\"},type2:[1,2,3]"
-    parsed = task_awareness._parse_context(context_str)
-    
-    assert isinstance(parsed, dict)
-    assert "type1" in parsed
-    assert parsed["type1"] == {"key": "value"}
-    assert "type2" in parsed
-    assert parsed["type2"] == [1, 2, 3]
+@pytest.mark.asyncio
+async def test_chain_context(task_awareness):
+    """Test chain context survives values containing commas"""
+    context = {"type1": {"key": "a,b"}, "type2": [1, 2, 3]}
+    task_id = await task_awareness.create_task(
+        title="Context Task",
+        description="Task with context",
+        context=context
+    )
+    
+    chain = await task_awareness.get_task_chain(task_id)
+    
+    assert chain[0]["context"] == context
 
 @pytest.mark.asyncio
 async def test_error_handling(task_awareness):
@@ -4,14 +4,14 @@ Tests for Octavia's UI Abilities
 
 import pytest
 from unittest.mock import Mock, MagicMock, patch, AsyncMock
-from consciousness.awareness.ui_abilities import UIAbilitiesRegistrar
+from consciousness.awareness.ui_abilities import UIAbilitiesRegistrar, UIAbilityMetrics
 from consciousness.awareness.abilities_awareness import AbilityAwareness, AbilityType
 
 @pytest.fixture
 def mock_ability_awareness():
     """Create mock ability awareness system"""
     awareness = AsyncMock(spec=AbilityAwareness)
-    awareness.register_ability = AsyncMock()
+    awareness.register_abilities_bulk = AsyncMock()
     return awareness
 
 @pytest.fixture
@@ -20,11 +20,17 @@ def ui_abilities(mock_ability_awareness):
     registrar = UIAbilitiesRegistrar(mock_ability_awareness)
     return registrar
 
+async def registered_specs(ui_abilities, mock_ability_awareness):
+    """Register UI abilities and return the specs, keyed by name"""
+    await ui_abilities.register_ui_abilities()
+    mock_ability_awareness.register_abilities_bulk.assert_awaited_once()
+    specs = mock_ability_awareness.register_abilities_bulk.call_args.args[0]
+    return {spec["name"]: spec for spec in specs}
+
 @pytest.mark.asyncio
 async def test_ability_registration(ui_abilities, mock_ability_awareness):
     """Test registration of UI abilities"""
-    # Register abilities
-    await ui_abilities.register_ui_abilities()
+    specs = await registered_specs(ui_abilities, mock_ability_awareness)
     
     # Verify core abilities were registered
     expected_abilities = [
@@ -34,66 +40,88 @@ async def test_ability_registration(ui_abilities, mock_ability_awareness):
         "Mouse Tracking"
     ]
     
-    # Count registered abilities
-    register_calls = mock_ability_awareness.register_ability.call_args_list
-    registered_names = [call.kwargs["name"] for call in register_calls]
-    
     # Verify all expected abilities were registered
     for ability in expected_abilities:
-        assert ability in registered_names
+        assert ability in specs
 
 @pytest.mark.asyncio
 async def test_window_management_registration(ui_abilities, mock_ability_awareness):
     """Test window management ability registration"""
-    # Register window management
-    await ui_abilities._register_window_management()
+    specs = await registered_specs(ui_abilities, mock_ability_awareness)
     
-    # Verify registration
-    mock_ability_awareness.register_ability.assert_called_with(
-        name="Window Management",
-        ability_type=AbilityType.UI,
-        description="Manages window state and layout",
-        handler=ui_abilities._handle_window_management
-    )
+    assert specs["Window Management"] == {
+        "name": "Window Management",
+        "ability_type": AbilityType.UI,
+        "description": "Manages window state and layout",
+        "handler": ui_abilities._handle_window_management
+    }
 
 @pytest.mark.asyncio
 async def test_layout_abilities_registration(ui_abilities, mock_ability_awareness):
     """Test layout abilities registration"""
-    # Register layout abilities
-    await ui_abilities._register_layout_abilities()
+    specs = await registered_specs(ui_abilities, mock_ability_awareness)
     
-    # Verify registration
-    mock_ability_awareness.register_ability.assert_called_with(
-        name="Layout Adaptation",
-        ability_type=AbilityType.UI,
-        description="Adapts UI layout based on context",
-        handler=ui_abilities._handle_layout_adaptation
-    )
+    assert specs["Layout Adaptation"] == {
+        "name": "Layout Adaptation",
+        "ability_type": AbilityType.UI,
+        "description": "Adapts UI layout based on context",
+        "handler": ui_abilities._handle_layout_adaptation
+    }
 
 @pytest.mark.asyncio
 async def test_interaction_awareness_registration(ui_abilities, mock_ability_awareness):
     """Test interaction awareness registration"""
-    # Register interaction awareness
-    await ui_abilities._register_interaction_awareness()
+    specs = await registered_specs(ui_abilities, mock_ability_awareness)
     
-    # Verify registration
-    mock_ability_awareness.register_ability.assert_called_with(
-        name="Interaction Context",
-        ability_type=AbilityType.UI,
-        description="Tracks and responds to user interactions",
-        handler=ui_abilities._handle_interaction_context
-    )
+    assert specs["Interaction Context"] == {
+        "name": "Interaction Context",
+        "ability_type": AbilityType.UI,
+        "description": "Tracks and responds to user interactions",
+        "handler": ui_abilities._handle_interaction_context
+    }
 
 @pytest.mark.asyncio
 async def test_mouse_tracking_registration(ui_abilities, mock_ability_awareness):
     """Test mouse tracking registration"""
-    # Register mouse tracking
-    await ui_abilities._register_mouse_tracking()
+    specs = await registered_specs(ui_abilities, mock_ability_awareness)
+    
+    assert specs["Mouse Tracking"] == {
+        "name": "Mouse Tracking",
+        "ability_type": AbilityType.UI,
+        "description": "Tracks mouse position and behavior",
+        "handler": ui_abilities._handle_mouse_tracking
+    }
+
+def test_usage_history_is_bounded():
+    """Test usage history keeps only the most recent contexts"""
+    metrics = UIAbilityMetrics()
+    for i in range(UIAbilityMetrics.MAX_CONTEXTS + 10):
+        metrics.log_ability_usage("window_management", {"step": i})
+        
+    usage = metrics.get_ability_insights("window_management")["usage"]
+    assert usage["total_uses"] == UIAbilityMetrics.MAX_CONTEXTS + 10
+    assert len(usage["contexts"]) == UIAbilityMetrics.MAX_CONTEXTS
+    assert len(usage["timestamps"]) == UIAbilityMetrics.MAX_CONTEXTS
+    assert usage["contexts"][0] == {"step": 10}
+    assert usage["last_used"] == usage["timestamps"][-1]
+
+def test_feedback_grouped_by_ability():
+    """Test insights only include feedback for the requested ability"""
+    metrics = UIAbilityMetrics()
+    metrics.log_ability_usage("window_management", {})
+    metrics.add_user_feedback("window_management", {"rating": 5})
+    metrics.add_user_feedback("mouse_tracking", {"rating": 2})
+    
+    feedback = metrics.get_ability_insights("window_management")["feedback"]
+    assert [f["feedback"] for f in feedback] == [{"rating": 5}]
+
+def test_feedback_is_bounded():
+    """Test only the most recent feedback per ability is kept"""
+    metrics = UIAbilityMetrics()
+    metrics.log_ability_usage("window_management", {})
+    for rating in range(UIAbilityMetrics.MAX_FEEDBACK + 5):
+        metrics.add_user_feedback("window_management", {"rating": rating})
     
-    # Verify registration
-    mock_ability_awareness.register_ability.assert_called_with(
-        name="Mouse Tracking",
-        ability_type=AbilityType.UI,
-        description="Tracks mouse position and behavior",
-        handler=ui_abilities._handle_mouse_tracking
-    )
+    feedback = metrics.get_ability_insights("window_management")["feedback"]
+    assert len(feedback) == UIAbilityMetrics.MAX_FEEDBACK
+    assert feedback[0]["feedback"] == {"rating": 5}
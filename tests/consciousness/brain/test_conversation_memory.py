@@ -0,0 +1,38 @@
+"""
+Tests for Octavia's rolling conversation memory
+"""
+
+from consciousness.brain.modules.conversation_manager import MemorySummary
+
+def test_recent_turns_are_kept_verbatim():
+    """Test turns past the recent window move to pending in order"""
+    memory = MemorySummary(recent_turns=2)
+    for i in range(3):
+        memory.add_turn(f"q{i}", f"a{i}")
+    
+    assert memory.pending == [("q0", "a0")]
+    assert memory.messages() == ["q0", "a0", "q1", "a1", "q2", "a2"]
+
+def test_summary_replaces_pending_turns():
+    """Test an applied summary leads the context and drops covered turns"""
+    memory = MemorySummary(recent_turns=1)
+    for i in range(3):
+        memory.add_turn(f"q{i}", f"a{i}")
+    
+    memory.apply_summary("- user asked twice", 2)
+    
+    assert memory.pending == []
+    assert memory.messages()[0].endswith("- user asked twice")
+    assert memory.messages()[1:] == ["q2", "a2"]
+
+def test_compact_stays_within_budget():
+    """Test compacting without the model keeps the summary bounded"""
+    memory = MemorySummary(recent_turns=1, token_budget=50)
+    for i in range(20):
+        memory.add_turn("question " * 20, "answer " * 20)
+    
+    assert memory.needs_summary()
+    memory.compact()
+    
+    assert not memory.pending
+    assert memory.estimate_tokens(memory.summary) <= memory.token_budget
@@ -0,0 +1,50 @@
+"""
+Tests for Octavia's media cache
+"""
+
+import pytest
+
+from consciousness.brain.modules.media_cache import CachedBlob, MediaCache
+
+def test_evicts_least_recently_used():
+    """Test entries are evicted oldest-first once the byte limit is hit"""
+    cache = MediaCache(max_bytes=10)
+    cache.put("a", {"data": b"aaaa"}, 4)
+    cache.put("b", {"data": b"bbbb"}, 4)
+    
+    # Touch "a" so "b" becomes the oldest
+    assert cache.get("a") is not None
+    cache.put("c", {"data": b"cccc"}, 4)
+    
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.current_bytes == 8
+
+def test_rejects_oversized_entry():
+    """Test an entry larger than the whole cache is not stored"""
+    cache = MediaCache(max_bytes=10)
+    cache.put("a", {"data": b"aaaa"}, 4)
+    
+    assert not cache.put("big", {"data": b"x" * 11}, 11)
+    assert "big" not in cache
+    assert "a" in cache
+
+def test_replacing_entry_updates_size():
+    """Test storing an existing key replaces its byte count"""
+    cache = MediaCache(max_bytes=10)
+    cache.put("a", {"data": b"aaaa"}, 4)
+    cache.put("a", {"data": b"aa"}, 2)
+    
+    assert len(cache) == 1
+    assert cache.current_bytes == 2
+
+def test_cached_blob_supports_item_access():
+    """Test blobs expose their fields as attributes and dict-style keys"""
+    blob = CachedBlob("files/abc", "image/png")
+    
+    assert blob.mime_type == "image/png"
+    assert blob["file_uri"] == "files/abc"
+    assert blob["file"] is None
+    with pytest.raises(KeyError):
+        blob["data"]
@@ -0,0 +1,64 @@
+"""
+Tests for Octavia's model manager
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+genai = pytest.importorskip("google.generativeai")
+
+from consciousness.brain.modules.conversation_manager import MemorySummary
+from consciousness.brain.modules.model_manager import ModelManager
+
+def _file(state):
+    """A File API handle stub in the given state"""
+    return SimpleNamespace(name="files/abc", uri="uri/abc", state=SimpleNamespace(name=state))
+
+def test_upload_waits_until_active(monkeypatch):
+    """Test uploads still processing are polled until ACTIVE"""
+    states = iter(["PROCESSING", "ACTIVE"])
+    monkeypatch.setattr(genai, "upload_file", lambda **kwargs: _file("PROCESSING"))
+    monkeypatch.setattr(genai, "get_file", lambda name: _file(next(states)))
+    manager = ModelManager()
+    manager.FILE_POLL_INTERVAL = 0
+    
+    uploaded = manager.upload_file("clip.mp4", "video/mp4")
+    
+    assert uploaded.state.name == "ACTIVE"
+
+def test_failed_upload_raises(monkeypatch):
+    """Test an upload the File API could not process is not returned"""
+    monkeypatch.setattr(genai, "upload_file", lambda **kwargs: _file("PROCESSING"))
+    monkeypatch.setattr(genai, "get_file", lambda name: _file("FAILED"))
+    manager = ModelManager()
+    manager.FILE_POLL_INTERVAL = 0
+    
+    with pytest.raises(ValueError):
+        manager.upload_file("clip.mp4", "video/mp4")
+
+@pytest.mark.asyncio
+async def test_memory_sent_with_message():
+    """Test the rolling summary and recent turns lead the outgoing request"""
+    memory = MemorySummary(recent_turns=1)
+    memory.add_turn("q0", "a0")
+    memory.add_turn("q1", "a1")
+    memory.apply_summary("- user asked about q0", 1)
+    sent = []
+    
+    async def chunks():
+        yield SimpleNamespace(text="ok")
+        
+    async def generate_content_async(contents, **kwargs):
+        sent.append(contents)
+        return chunks()
+        
+    manager = ModelManager()
+    manager.model = SimpleNamespace(generate_content_async=generate_content_async)
+    
+    reply = [c async for c in manager.generate_stream("q2", history=memory.render())]
+    
+    assert reply == ["ok"]
+    assert "- user asked about q0" in sent[0]
+    assert sent[0].index("User: q1\nOctavia: a1") < sent[0].index("User: q2")
+    assert sent[0].endswith("User: q2")